@@ -0,0 +1,304 @@
+import http.client
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urljoin, urlsplit
+
+from epc_downloads import write_atomically
+from epc_ratelimit import RateLimiter, THROTTLE_STATUSES
+
+GOV_UK_START_URL = "https://www.gov.uk/find-energy-certificate"
+EPC_SERVICE_URL = "https://find-energy-certificate.service.gov.uk"
+POSTCODE_SEARCH_PATH = "/find-a-certificate/search-by-postcode"
+CERTIFICATE_RRN = re.compile(r'/energy-certificate/(\d{4}(?:-\d{4}){4})')
+
+
+def certificate_rrn(href):
+    """The report reference number (RRN) in a certificate URL, or None"""
+    match = CERTIFICATE_RRN.search(href or '')
+    return match.group(1) if match else None
+
+
+class AddressLinkParser(HTMLParser):
+    """Collect the certificate links (text and href) from a postcode results page"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self._current = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            href = dict(attrs).get('href') or ''
+            # Same rule as the Selenium XPath: //a[contains(@href, 'certificate')]
+            if 'certificate' in href:
+                self._current = {'text': '', 'href': href}
+
+    def handle_data(self, data):
+        if self._current is not None:
+            self._current['text'] += data
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._current is not None:
+            self._current['text'] = ' '.join(self._current['text'].split())
+            self.links.append(self._current)
+            self._current = None
+
+
+class SeleniumBackend:
+    """Drive the gov.uk pages through the scraper's Chrome session"""
+
+    name = 'selenium'
+
+    def __init__(self, scraper):
+        self.scraper = scraper
+
+    def search_postcode(self, postcode):
+        return self.scraper.search_postcode(postcode)
+
+    def open_certificate(self, candidate):
+        return self.scraper.open_address_candidate(candidate)
+
+    def save_certificate(self, filename):
+        return self.scraper.download_pdf(filename)
+
+    def current_page(self):
+        """(url, html) of the page the browser is showing"""
+        return self.scraper.driver.current_url, self.scraper.driver.page_source
+
+    def output_filename(self, filename):
+        return filename
+
+    def close(self):
+        if getattr(self.scraper, 'driver', None):
+            self.scraper.driver.quit()
+
+
+class HttpConnectionPool:
+    """Thread-safe pool of persistent keep-alive connections to a single host"""
+
+    def __init__(self, scheme, host, port=None, max_size=4, timeout=20):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=max_size)
+
+    def _new_connection(self):
+        if self.scheme == 'https':
+            return http.client.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, body=None, headers=None):
+        """Send a request and return (status, headers, body bytes), retrying once on a dropped keep-alive"""
+        for attempt in range(2):
+            try:
+                conn = self.idle.get_nowait()
+            except queue.Empty:
+                conn = self._new_connection()
+
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                conn.close()
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                try:
+                    self.idle.put_nowait(conn)
+                except queue.Full:
+                    conn.close()
+            return response.status, response.headers, data
+
+    def close(self):
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class HttpBackend:
+    """Browserless backend: fetch and parse the server-rendered search and certificate pages over HTTP"""
+
+    name = 'http'
+
+    def __init__(self, download_dir, service_url=EPC_SERVICE_URL, logger=None, pool_size=4, timeout=20,
+                 rate_limiter=None, throttle_retries=2, throttle_backoff=1.0, max_retry_after=60):
+        self.download_dir = download_dir
+        self.service_url = service_url.rstrip('/')
+        self.logger = logger or logging.getLogger(__name__)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter(rate=None)
+        self.throttle_retries = throttle_retries  # Retries of a 429/503, after the limiter has backed off
+        self.throttle_backoff = throttle_backoff  # First wait before a retry when there is no rate to slow down
+        self.max_retry_after = max_retry_after  # Longest Retry-After honoured, in seconds
+        self.pools = {}
+        self.pools_lock = threading.Lock()
+        self.cookies = SimpleCookie()
+        self.current_url = None
+        self.current_html = None
+
+    def _pool_for(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        with self.pools_lock:
+            if key not in self.pools:
+                self.pools[key] = HttpConnectionPool(parts.scheme, parts.hostname, parts.port,
+                                                     max_size=self.pool_size, timeout=self.timeout)
+            return self.pools[key]
+
+    def get(self, url, max_redirects=5):
+        """GET a URL over a pooled connection, following redirects; returns (final_url, status, text)"""
+        for _ in range(max_redirects + 1):
+            parts = urlsplit(url)
+            path = parts.path or '/'
+            if parts.query:
+                path += '?' + parts.query
+
+            headers = {
+                'User-Agent': 'EPC-Certificate-Scraper',
+                'Accept': 'text/html',
+                'Connection': 'keep-alive',
+            }
+            cookie_header = '; '.join(f"{k}={m.value}" for k, m in self.cookies.items())
+            if cookie_header:
+                headers['Cookie'] = cookie_header
+
+            for attempt in range(self.throttle_retries + 1):
+                with self.rate_limiter.request() as request:
+                    status, response_headers, data = self._pool_for(url).request('GET', path, headers=headers)
+                    request.status = status
+                if status not in THROTTLE_STATUSES or attempt == self.throttle_retries:
+                    break
+                delay = self.retry_delay(response_headers, attempt)
+                if delay:
+                    self.logger.warning(f"{url} returned status {status}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                else:
+                    self.logger.warning(f"{url} returned status {status}, retrying at the reduced rate")
+            for set_cookie in response_headers.get_all('Set-Cookie') or []:
+                self.cookies.load(set_cookie)
+
+            if status in (301, 302, 303, 307, 308) and response_headers.get('Location'):
+                url = urljoin(url, response_headers['Location'])
+                continue
+
+            charset = response_headers.get_content_charset() or 'utf-8'
+            return url, status, data.decode(charset, errors='replace')
+
+        raise Exception(f"Too many redirects fetching {url}")
+
+    def retry_delay(self, response_headers, attempt):
+        """Seconds to wait before retrying a throttled request.
+
+        The server's Retry-After wins; otherwise, when the shared limiter has no
+        rate to halve, back off exponentially. With a rate, the limiter already
+        spaces the retry out, so there is no extra wait.
+        """
+        retry_after = response_headers.get('Retry-After')
+        if retry_after:
+            try:
+                delay = float(retry_after)
+            except ValueError:
+                try:
+                    delay = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+                except (TypeError, ValueError):
+                    delay = None
+            if delay is not None:
+                return min(max(0.0, delay), self.max_retry_after)
+        if not self.rate_limiter.rate:
+            return self.throttle_backoff * 2 ** attempt
+        return 0.0
+
+    def search_postcode(self, postcode):
+        """Fetch the domestic results page for a postcode and return its candidate address links"""
+        query = urlencode({'postcode': postcode.strip(), 'property_type': 'domestic'})
+        url = f"{self.service_url}{POSTCODE_SEARCH_PATH}?{query}"
+        try:
+            final_url, status, html = self.get(url)
+        except Exception as e:
+            self.logger.error(f"HTTP search failed for {postcode}: {e}")
+            return None
+
+        if status != 200:
+            self.logger.error(f"HTTP search for {postcode} returned status {status}")
+            return None
+
+        parser = AddressLinkParser()
+        parser.feed(html)
+        candidates = [{'text': link['text'], 'href': urljoin(final_url, link['href'])} for link in parser.links]
+        if not candidates:
+            self.logger.error(f"No address links found for {postcode}")
+            return None
+
+        self.logger.info(f"Found {len(candidates)} address links")
+        return candidates
+
+    def open_certificate(self, candidate):
+        """Fetch the certificate page for a candidate and keep it for save_certificate"""
+        try:
+            final_url, status, html = self.get(candidate['href'])
+        except Exception as e:
+            self.logger.error(f"Failed to fetch certificate page for '{candidate['text']}': {e}")
+            return False
+
+        if status != 200:
+            self.logger.error(f"Certificate page {candidate['href']} returned status {status}")
+            return False
+
+        self.current_url = final_url
+        self.current_html = html
+        self.logger.info(f"Fetched certificate page: {final_url}")
+        return True
+
+    def current_page(self):
+        """(url, html) of the last fetched certificate page"""
+        return self.current_url, self.current_html
+
+    def output_filename(self, filename):
+        """Certificates are saved as .html - rendering a PDF needs a browser"""
+        return os.path.splitext(filename)[0] + '.html'
+
+    def save_certificate(self, filename):
+        """Save the fetched certificate page next to where the PDF would go"""
+        if self.current_html is None:
+            self.logger.error("No certificate page has been fetched")
+            return False
+
+        html_filename = self.output_filename(filename)
+        target_path = os.path.join(self.download_dir, html_filename)
+
+        # Keep relative stylesheet and image links working when the file is opened locally
+        html = self.current_html.replace('<head>', f'<head><base href="{self.current_url}">', 1)
+        try:
+            write_atomically(target_path, html.encode('utf-8'))
+        except Exception as e:
+            self.logger.error(f"Failed to save certificate page: {e}")
+            return False
+
+        self.logger.info(f"Certificate page saved to: {html_filename}")
+        return True
+
+    def close(self):
+        with self.pools_lock:
+            for pool in self.pools.values():
+                pool.close()
+            self.pools.clear()
@@ -0,0 +1,369 @@
+"""Offline benchmarks for the EPC scraper.
+
+    python epc_benchmark.py matching --candidates 500 --targets 200
+    python epc_benchmark.py e2e --rows 200 --workers 1,4 --latency 0.2 --jitter 0.1
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+import epc_matching
+from epc_fake_site import FakeEPCSite, parse_range
+from epc_matching import AddressMatcher
+from epc_timing import percentile
+
+BUILDINGS = ["Mallard House", "Heron Court", "Kingfisher Lodge", "Swift House", "Wren Court"]
+STREETS = ["Iris Avenue", "Meadow Way", "Station Road", "Mill Lane", "Orchard Close"]
+
+
+def synthetic_postcode(rng, candidates, targets):
+    """A postcode result list and spreadsheet rows in the shapes the scraper sees"""
+    postcode = "CT1 2AB"
+    candidate_list = [
+        {'text': f"Flat {i}, {rng.choice(BUILDINGS)}, {rng.choice(STREETS)}, Canterbury, {postcode}",
+         'href': f"/energy-certificate/{i:04d}-0000-0000-0000-0000"}
+        for i in range(1, candidates + 1)
+    ]
+    candidate_list.append({'text': "Get a new energy certificate", 'href': "/getting-a-new-energy-certificate"})
+    target_list = [
+        f"Flat {rng.randint(1, candidates)}, {rng.choice(BUILDINGS)}, Canterbury"
+        for _ in range(targets)
+    ]
+    return target_list, candidate_list
+
+
+class LegacyMatcher:
+    """The scraper's address matching before the batch engine, copied verbatim as the benchmark baseline"""
+
+    def __init__(self, logger):
+        self.logger = logger
+
+    def normalize_address_for_matching(self, address):
+        """Normalize address text for better matching"""
+        if not address:
+            return ""
+        
+        # Convert to lowercase
+        normalized = address.lower()
+        
+        # Remove common prefixes and suffixes
+        normalized = re.sub(r'\b(flat|apartment|apt|unit)\s*', '', normalized)
+        
+        # Remove punctuation and extra spaces
+        normalized = re.sub(r'[,\.\-\(\)]', ' ', normalized)
+        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        
+        # Remove common words that don't help with matching
+        stop_words = ['the', 'and', 'of', 'in', 'at', 'to', 'for', 'with', 'by']
+        words = normalized.split()
+        words = [word for word in words if word not in stop_words]
+        
+        return ' '.join(words)
+
+    def extract_property_number(self, address):
+        """Extract property number from address"""
+        # Look for patterns like "Flat 9", "9 HOUSE", "Unit 4", etc.
+        patterns = [
+            r'\b(?:flat|apartment|apt|unit)\s*(\d+)\b',  # "Flat 9"
+            r'\b(\d+)\s+(?:flat|apartment|apt|unit)\b',  # "9 Flat"
+            r'^(\d+)\s+\w+',  # "9 HOUSE" at start
+            r'\b(\d+)\s*[,\s]',  # Any number followed by comma or space
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, address.lower())
+            if match:
+                return match.group(1)
+        return None
+
+    def extract_building_name(self, address):
+        """Extract building name from address"""
+        # Remove property numbers and common prefixes
+        cleaned = re.sub(r'^\d+\s*', '', address)  # Remove leading numbers
+        cleaned = re.sub(r'\b(?:flat|apartment|apt|unit)\s*\d+[,\s]*', '', cleaned, flags=re.IGNORECASE)
+        
+        # Get the first significant part (usually building name)
+        parts = [part.strip() for part in cleaned.split(',') if part.strip()]
+        if parts:
+            # Return first part, but clean it up
+            building = parts[0].strip()
+            building = re.sub(r'[,\.]', '', building)
+            return building.lower()
+        return ""
+
+    def calculate_enhanced_address_match_score(self, target_address, option_text):
+        """Enhanced address matching with better logic"""
+        try:
+            target_lower = target_address.lower()
+            option_lower = option_text.lower()
+            
+            # Extract components
+            target_number = self.extract_property_number(target_address)
+            option_number = self.extract_property_number(option_text)
+            
+            target_building = self.extract_building_name(target_address)
+            option_building = self.extract_building_name(option_text)
+            
+            # Normalize both addresses
+            target_normalized = self.normalize_address_for_matching(target_address)
+            option_normalized = self.normalize_address_for_matching(option_text)
+            
+            score = 0.0
+            
+            # Property number matching (high weight)
+            if target_number and option_number:
+                if target_number == option_number:
+                    score += 0.4  # Strong match for same number
+                else:
+                    score -= 0.3  # Penalty for different numbers
+            elif target_number or option_number:
+                score -= 0.1  # Small penalty if only one has a number
+            
+            # Building name matching (high weight)
+            if target_building and option_building:
+                if target_building in option_building or option_building in target_building:
+                    score += 0.4
+                else:
+                    # Check for partial matches
+                    target_words = set(target_building.split())
+                    option_words = set(option_building.split())
+                    common_building_words = target_words.intersection(option_words)
+                    if common_building_words:
+                        score += 0.2 * len(common_building_words) / max(len(target_words), len(option_words))
+            
+            # Overall word matching (medium weight)
+            target_words = set(target_normalized.split())
+            option_words = set(option_normalized.split())
+            
+            if len(target_words) > 0:
+                common_words = target_words.intersection(option_words)
+                word_score = len(common_words) / len(target_words)
+                score += 0.2 * word_score
+            
+            # Substring matching for exact phrases (low weight)
+            if target_building and target_building in option_lower:
+                score += 0.1
+            
+            # Debug logging
+            self.logger.debug(f"Matching '{target_address}' vs '{option_text}':")
+            self.logger.debug(f"  Target number: {target_number}, Option number: {option_number}")
+            self.logger.debug(f"  Target building: '{target_building}', Option building: '{option_building}'")
+            self.logger.debug(f"  Final score: {score}")
+            
+            return max(0.0, min(1.0, score))  # Clamp between 0 and 1
+            
+        except Exception as e:
+            self.logger.warning(f"Error in enhanced address matching: {e}")
+            return 0.0
+
+    def select(self, target_address, candidates):
+        """The old select_address loop for one row, returning (candidate, score) instead of clicking it"""
+        best_match = None
+        best_score = 0
+        exact_matches = []
+        
+        for candidate in candidates:
+            link_text = candidate['text']
+            
+            # Skip empty or irrelevant links
+            if not link_text or "get a new energy certificate" in link_text.lower():
+                continue
+            
+            # Calculate enhanced match score
+            score = self.calculate_enhanced_address_match_score(target_address, link_text)
+            
+            # Check for high confidence matches
+            if score >= 0.8:
+                exact_matches.append((candidate, score))
+            
+            if score > best_score:
+                best_score = score
+                best_match = (candidate, score)
+        
+        # Prefer high-confidence matches
+        if exact_matches:
+            # Sort by score and take the highest
+            exact_matches.sort(key=lambda x: x[1], reverse=True)
+            return exact_matches[0]
+        if best_match and best_score > 0.3:
+            return best_match
+        
+        # Fallback to first address if no good matches
+        if candidates:
+            return candidates[0], 0.0
+        return None, 0.0
+
+
+def bench_matching(args):
+    rng = random.Random(args.seed)
+    targets, candidates = synthetic_postcode(rng, args.candidates, args.targets)
+    logger = logging.getLogger('epc_benchmark')
+    logger.setLevel(logging.INFO)
+
+    baseline = LegacyMatcher(logger)
+    start = time.perf_counter()
+    legacy = [baseline.select(t, candidates) for t in targets]
+    legacy_time = time.perf_counter() - start
+
+    epc_matching.address_features.cache_clear()  # Cold cache: include the one-off normalization cost
+    matcher = AddressMatcher()
+    start = time.perf_counter()
+    batch = [selection[:2] for selection in matcher.best_matches(targets, candidates)]
+    batch_time = time.perf_counter() - start
+
+    # Every pairwise score as well as the selections, so a difference hidden by the selection rules still shows
+    legacy_scores = [[baseline.calculate_enhanced_address_match_score(t, c['text']) if epc_matching.is_selectable(c) else None
+                      for c in candidates] for t in targets]
+    score_mismatches = sum(old != new
+                           for old_row, new_row in zip(legacy_scores, matcher.score_batch(targets, candidates))
+                           for old, new in zip(old_row, new_row))
+    identical = legacy == batch and not score_mismatches
+    comparisons = len(targets) * len(candidates)
+    print(f"Matching {len(targets)} rows against {len(candidates)} candidates ({comparisons:,} comparisons)")
+    print(f"  per-comparison scoring: {legacy_time:.3f}s ({comparisons / legacy_time:,.0f} comparisons/s)")
+    print(f"  batch engine:           {batch_time:.3f}s ({comparisons / batch_time:,.0f} comparisons/s)")
+    print(f"  speedup:                {legacy_time / batch_time:.1f}x")
+    print(f"  identical selections:   {'yes' if legacy == batch else 'NO'}")
+    print(f"  identical scores:       {'yes' if not score_mismatches else f'NO ({score_mismatches:,} differ)'}")
+    return 0 if identical else 1
+
+
+def synthetic_spreadsheet(path, rows, postcodes, rng):
+    """A spreadsheet in the scraper's multi-column format, spread over ``postcodes`` postcodes"""
+    codes = [f"CT{i // 26 + 1} {i % 10}{chr(65 + i % 26)}B" for i in range(postcodes)]
+    records = []
+    for i in range(rows):
+        records.append({
+            'UPRN': 56540000000 + i,
+            'Scheme Abbreviation': 'BEN',
+            'Development Plot Number': i + 1,
+            'Tenure': rng.choice(['SO', 'AR']),
+            'Address Line 1': f"Flat {rng.randint(1, 10)}",
+            'Address Line 2': rng.choice(BUILDINGS),
+            'Town': 'Canterbury',
+            'Post Code': rng.choice(codes),
+        })
+    pd.DataFrame(records).to_excel(path, index=False)
+
+
+def run_scenario(args, workers, batch_by_postcode):
+    """Run the scraper against a fresh stand-in site and return its measurements"""
+    # Imported here so the matching benchmark doesn't need selenium installed
+    from epc_scraper import EPCCertificateScraper
+
+    min_addresses, max_addresses = args.addresses_per_postcode
+    workdir = tempfile.mkdtemp(prefix='epc_bench_')
+    spreadsheet = os.path.join(workdir, 'benchmark.xlsx')
+    synthetic_spreadsheet(spreadsheet, args.rows, args.postcodes, random.Random(args.seed))
+
+    site = FakeEPCSite(addresses_per_postcode=min_addresses, max_addresses_per_postcode=max_addresses,
+                       latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                       throttle_rate=args.throttle_rate, seed=args.seed).start()
+    scraper = None
+    try:
+        scraper = EPCCertificateScraper(download_dir=os.path.join(workdir, 'Processed'),
+                                        batch_by_postcode=batch_by_postcode, use_cache=False,
+                                        backend=args.backend, start_url=site.start_url, service_url=site.base_url,
+                                        workers=workers, rate_limit=args.rate_limit, max_in_flight=workers,
+                                        pdf_mode=args.pdf_mode, deep_link=args.deep_link,
+                                        data_only=args.data_only, pipeline=args.pipeline,
+                                        lookup_workers=args.lookup_workers)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            scraper.process_spreadsheet(spreadsheet)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        row_times = sorted(scraper.timer.durations.get('row', []))
+        return {
+            'workers': workers,
+            'batched': batch_by_postcode,
+            'rows': scraper.success_count + scraper.failure_count,
+            'failed': scraper.failure_count,
+            'elapsed': elapsed,
+            'rows_per_hour': (scraper.success_count + scraper.failure_count) / elapsed * 3600 if elapsed else 0,
+            'p50': percentile(row_times, 50),
+            'p95': percentile(row_times, 95),
+            'p99': percentile(row_times, 99),
+            'peak_mb': peak / 1024 / 1024,
+            'site_requests': site.conditions.requests,
+        }
+    finally:
+        if scraper:
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraper.cleanup()
+        site.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_e2e(args):
+    # Keep the scraper's per-row INFO logging out of the benchmark output
+    logging.basicConfig(level=logging.WARNING)
+
+    batch_modes = [False, True] if args.batch_by_postcode == 'both' else [args.batch_by_postcode == 'on']
+    print(f"End-to-end: {args.rows} rows over {args.postcodes} postcodes, {args.backend} backend, "
+          f"latency {args.latency}s + up to {args.jitter}s jitter, "
+          f"{args.error_rate:.0%} errors, {args.throttle_rate:.0%} throttled")
+    print(f"{'workers':>7} {'batched':>7} {'rows':>5} {'failed':>6} {'time s':>8} {'rows/hour':>10} "
+          f"{'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'peak MB':>8} {'requests':>8}")
+
+    for workers in args.workers:
+        for batch_by_postcode in batch_modes:
+            r = run_scenario(args, workers, batch_by_postcode)
+            print(f"{r['workers']:>7} {'yes' if r['batched'] else 'no':>7} {r['rows']:>5} {r['failed']:>6} "
+                  f"{r['elapsed']:>8.2f} {r['rows_per_hour']:>10,.0f} {r['p50']:>7.3f} {r['p95']:>7.3f} "
+                  f"{r['p99']:>7.3f} {r['peak_mb']:>8.1f} {r['site_requests']:>8}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EPC scraper benchmarks')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    matching = subparsers.add_parser('matching', help='Address matching: per-comparison scoring vs the batch engine')
+    matching.add_argument('--candidates', type=int, default=500, help='Address links in the postcode result list')
+    matching.add_argument('--targets', type=int, default=200, help='Spreadsheet rows in the postcode')
+    matching.add_argument('--seed', type=int, default=1)
+    matching.set_defaults(func=bench_matching)
+
+    e2e = subparsers.add_parser('e2e', help='Throughput, row latency and peak memory against the local stand-in site')
+    e2e.add_argument('--rows', type=int, default=100, help='Spreadsheet rows to process')
+    e2e.add_argument('--postcodes', type=int, default=10, help='Distinct postcodes the rows are spread over')
+    e2e.add_argument('--backend', choices=['selenium', 'http'], default='http')
+    e2e.add_argument('--workers', type=lambda v: [int(w) for w in v.split(',')], default=[1],
+                     help='Comma-separated worker counts to compare, e.g. 1,2,4')
+    e2e.add_argument('--batch-by-postcode', choices=['on', 'off', 'both'], default='both')
+    e2e.add_argument('--deep-link', action='store_true')
+    e2e.add_argument('--data-only', action='store_true', help='Parse certificate fields instead of saving certificates')
+    e2e.add_argument('--pipeline', action='store_true', help='Run the scraper as a staged pipeline')
+    e2e.add_argument('--lookup-workers', type=int, default=1, help='Postcode search sessions with --pipeline')
+    e2e.add_argument('--pdf-mode', choices=['print', 'devtools'], default='devtools')
+    e2e.add_argument('--rate-limit', type=float, default=None, help='Scraper request rate limit (default: unlimited)')
+    e2e.add_argument('--latency', type=float, default=0.05, help='Site response delay in seconds')
+    e2e.add_argument('--jitter', type=float, default=0.05, help='Extra random site delay of up to this many seconds')
+    e2e.add_argument('--error-rate', type=float, default=0.0, help='Fraction of site responses that are 500s')
+    e2e.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of site responses that are 429s')
+    e2e.add_argument('--addresses-per-postcode', type=parse_range, default=(5, 40),
+                     help='N or MIN-MAX addresses in each postcode result list (default 5-40)')
+    e2e.add_argument('--seed', type=int, default=1)
+    e2e.set_defaults(func=bench_e2e)
+
+    args = parser.parse_args()
+    raise SystemExit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import logging
+import os
+import socket
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    # psutil reads the RSS of chromedriver's Chrome process tree
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+class BrowserHealthMonitor:
+    """Decide when a worker's Chrome session should be recycled, and restart it.
+
+    The browser is restarted every ``recycle_every`` rows, when the Chrome
+    process tree grows past ``max_memory_mb``, or when it stops answering a
+    trivial script. Each restart and its reason is kept for the report.
+    """
+
+    def __init__(self, scraper, recycle_every=200, max_memory_mb=1500, response_timeout=10, logger=None):
+        self.scraper = scraper
+        self.recycle_every = recycle_every  # 0 disables scheduled recycling
+        self.max_memory_mb = max_memory_mb  # 0 disables the memory check
+        self.response_timeout = response_timeout
+        self.logger = logger or logging.getLogger(__name__)
+        self.rows_since_restart = 0
+        self.restarts = []  # Reasons, in order
+
+        if max_memory_mb and not PSUTIL_AVAILABLE:
+            self.logger.info("psutil not installed: browser memory is not monitored (pip install psutil)")
+
+    def memory_mb(self):
+        """Resident memory of chromedriver and every Chrome process under it, or None if unknown"""
+        if not PSUTIL_AVAILABLE:
+            return None
+        try:
+            service = psutil.Process(self.scraper.driver.service.process.pid)
+            processes = [service] + service.children(recursive=True)
+        except Exception:
+            return None
+
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total / 1024 / 1024
+
+    def is_responsive(self):
+        """Run a trivial script; False if the session is gone or the renderer doesn't answer in time"""
+        outcome = {}
+
+        def probe():
+            try:
+                outcome['ok'] = self.scraper.driver.execute_script("return 1") == 1
+            except Exception as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=probe, daemon=True)
+        thread.start()
+        thread.join(self.response_timeout)
+        if thread.is_alive():
+            self.logger.warning(f"Browser did not respond within {self.response_timeout}s")
+            return False
+        if 'error' in outcome:
+            self.logger.warning(f"Browser session check failed: {outcome['error']}")
+            return False
+        return outcome.get('ok', False)
+
+    def restart_reason(self):
+        """Why the browser should be restarted before the next row, or None if it is healthy"""
+        if self.recycle_every and self.rows_since_restart >= self.recycle_every:
+            return f"recycled after {self.rows_since_restart} rows"
+
+        if self.max_memory_mb:
+            memory = self.memory_mb()
+            if memory is not None and memory > self.max_memory_mb:
+                return f"memory {memory:.0f} MB over {self.max_memory_mb} MB"
+
+        if not self.is_responsive():
+            return "unresponsive"
+        return None
+
+    def check(self):
+        """Restart the browser if needed before a row; returns the restart reason or None"""
+        reason = self.restart_reason()
+        if reason:
+            self.restart(reason)
+        return reason
+
+    def restart(self, reason):
+        self.logger.warning(f"Restarting browser{self.scraper.worker_label}: {reason}")
+        self.scraper.restart_browser()
+        self.restarts.append(reason)
+        self.rows_since_restart = 0
+
+    def row_done(self):
+        self.rows_since_restart += 1
+
+
+class ProfileSlot:
+    """A numbered browser profile slot on this host, held for the life of the process.
+
+    Worker processes sharing a folder each take the lowest free slot, so the next
+    run's processes reuse the same Chrome profiles and disk caches instead of
+    creating new ones. The slot is held with an OS file lock, which is released
+    even if the process dies.
+    """
+
+    def __init__(self, profile_root):
+        os.makedirs(profile_root, exist_ok=True)
+        host = socket.gethostname()
+        number = 1
+        while True:
+            lock_file = open(os.path.join(profile_root, f"{host}_{number}.lock"), 'a+')
+            if self._try_lock(lock_file):
+                break
+            lock_file.close()
+            number += 1
+        self.name = f"{host}_{number}"
+        self.lock_file = lock_file
+
+    @staticmethod
+    def _try_lock(lock_file):
+        try:
+            if fcntl:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def release(self):
+        if not self.lock_file.closed:
+            self.lock_file.close()
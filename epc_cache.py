@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class PostcodeSearchCache:
+    """SQLite cache of postcode search results: normalized postcode -> address candidates"""
+
+    def __init__(self, db_path, ttl_hours=168, max_entries=5000, logger=None):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()  # One connection shared by every worker thread
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # The file is shared with CertificateIndex and with every --worker process: wait on locks, don't fail
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postcode_results (
+                postcode TEXT PRIMARY KEY,
+                candidates TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+        self.evict()
+
+    def get(self, postcode):
+        """Return the cached candidate list for a normalized postcode, or None if missing or expired"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT candidates, fetched_at FROM postcode_results WHERE postcode = ?", (postcode,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            candidates, fetched_at = row
+            if now - fetched_at > self.ttl_seconds:
+                self.conn.execute("DELETE FROM postcode_results WHERE postcode = ?", (postcode,))
+                self.conn.commit()
+                return None
+
+            self.conn.execute("UPDATE postcode_results SET last_used = ? WHERE postcode = ?", (now, postcode))
+            self.conn.commit()
+
+        self.logger.info(f"Postcode cache hit: {postcode} (fetched {(now - fetched_at) / 3600:.1f}h ago)")
+        return json.loads(candidates)
+
+    def put(self, postcode, candidates):
+        """Store the candidate list (link text, certificate href, fetch time) for a normalized postcode"""
+        now = time.time()
+        entries = [
+            {'text': c['text'], 'href': c['href'], 'fetched_at': now}
+            for c in candidates if c.get('href')
+        ]
+        if not entries:
+            return
+
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO postcode_results (postcode, candidates, fetched_at, last_used) VALUES (?, ?, ?, ?)",
+                (postcode, json.dumps(entries), now, now)
+            )
+            self.conn.commit()
+        self.evict()
+
+    def invalidate(self, postcode):
+        """Drop a postcode whose cached results turned out to be stale"""
+        with self.lock:
+            self.conn.execute("DELETE FROM postcode_results WHERE postcode = ?", (postcode,))
+            self.conn.commit()
+        self.logger.info(f"Postcode cache entry invalidated: {postcode}")
+
+    def evict(self):
+        """Remove expired entries, then the least recently used ones beyond max_entries"""
+        with self.lock:
+            self.conn.execute("DELETE FROM postcode_results WHERE fetched_at < ?", (time.time() - self.ttl_seconds,))
+            self.conn.execute("""
+                DELETE FROM postcode_results WHERE postcode IN (
+                    SELECT postcode FROM postcode_results ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class CertificateIndex:
+    """SQLite index of UPRN -> certificate link found by an earlier run, so repeat runs can skip the search"""
+
+    def __init__(self, db_path, logger=None):
+        self.db_path = db_path
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS uprn_certificates (
+                uprn TEXT PRIMARY KEY,
+                href TEXT NOT NULL,
+                rrn TEXT,
+                postcode TEXT,
+                matched_address TEXT,
+                match_score REAL,
+                indexed_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, uprn):
+        """Return the indexed certificate for a UPRN as a dict, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT href, rrn, postcode, matched_address, match_score, indexed_at FROM uprn_certificates WHERE uprn = ?",
+                (uprn,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('href', 'rrn', 'postcode', 'matched_address', 'match_score', 'indexed_at'), row))
+
+    def put(self, uprn, href, rrn=None, postcode=None, matched_address=None, match_score=None):
+        """Record the certificate a UPRN matched with high confidence"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO uprn_certificates "
+                "(uprn, href, rrn, postcode, matched_address, match_score, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (uprn, href, rrn, postcode, matched_address, match_score, time.time())
+            )
+            self.conn.commit()
+
+    def invalidate(self, uprn):
+        """Drop a UPRN whose indexed certificate has moved or been superseded"""
+        with self.lock:
+            self.conn.execute("DELETE FROM uprn_certificates WHERE uprn = ?", (uprn,))
+            self.conn.commit()
+        self.logger.info(f"UPRN index entry invalidated: {uprn}")
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM uprn_certificates").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
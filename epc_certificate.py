@@ -0,0 +1,243 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from html.parser import HTMLParser
+
+import pandas as pd
+
+from epc_backends import certificate_rrn
+from epc_downloads import write_atomically
+
+try:
+    # pyarrow writes the certificate data table as Parquet; without it the table is CSV
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Summary list labels on the certificate page -> metadata keys
+CERTIFICATE_FIELDS = {
+    'certificate number': 'rrn',
+    'date of certificate': 'lodgement_date',
+    'date of assessment': 'assessment_date',
+    'valid until': 'expiry_date',
+}
+
+# Sidecar keys compared by --refresh to decide whether a certificate has changed
+METADATA_KEYS = ('rrn', 'lodgement_date', 'expiry_date', 'content_hash')
+
+# Metadata keys -> report columns
+REPORT_COLUMNS = {
+    'rrn': 'Certificate_RRN',
+    'current_rating': 'Current_Rating',
+    'current_score': 'Current_Score',
+    'potential_rating': 'Potential_Rating',
+    'potential_score': 'Potential_Score',
+    'assessment_date': 'Assessment_Date',
+    'lodgement_date': 'Certificate_Date',
+    'expiry_date': 'Valid_Until',
+}
+
+# Result columns written to the certificate data table, besides REPORT_COLUMNS
+TABLE_ROW_COLUMNS = ['Original_Index', 'Original_UPRN', 'Input_Address', 'Input_Postcode', 'Status',
+                     'Matched_Address', 'Certificate_URL']
+
+# Numeric columns of the certificate data table; every other column is text
+NUMERIC_TABLE_COLUMNS = {'Original_Index': 'int64', 'Current_Score': 'float64', 'Potential_Score': 'float64'}
+
+# Rows of the certificate data table held in memory at a time
+TABLE_CHUNK_ROWS = 10000
+
+# The rating graphs label each arrow "72 | C" (score, band)
+RATING_LABEL = re.compile(r'(\d{1,3})\s*\|?\s*([A-G])\b')
+RATING_SENTENCES = {
+    'current': re.compile(r"current energy rating is ([A-G])\b"),
+    'potential': re.compile(r"potential to be ([A-G])\b"),
+}
+
+
+class CertificatePageParser(HTMLParser):
+    """Collect the summary list fields (<dt>label</dt><dd>value</dd>), the rating graph labels and the visible text of <main>"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.fields = {}
+        self.ratings = {}  # 'current'/'potential' -> label text
+        self.text = []
+        self._in_main = 0
+        self._skip = 0  # Inside <script>/<style>
+        self._tag = None  # 'dt' or 'dd' being read
+        self._buffer = ''
+        self._label = None
+        self._rating = None  # [kind, tag, nesting depth] of the rating element being read
+
+    def handle_starttag(self, tag, attrs):
+        if self._rating:
+            if tag == self._rating[1]:
+                self._rating[2] += 1
+        else:
+            classes = (dict(attrs).get('class') or '').split()
+            for kind in ('current', 'potential'):
+                if f'rating-{kind}' in classes:
+                    self._rating = [kind, tag, 1]
+                    self.ratings.setdefault(kind, '')
+
+        if tag == 'main':
+            self._in_main += 1
+        elif tag in ('script', 'style'):
+            self._skip += 1
+        elif tag in ('dt', 'dd'):
+            self._tag = tag
+            self._buffer = ''
+
+    def handle_endtag(self, tag):
+        if self._rating and tag == self._rating[1]:
+            self._rating[2] -= 1
+            if not self._rating[2]:
+                self._rating = None
+
+        if tag == 'main':
+            self._in_main = max(0, self._in_main - 1)
+        elif tag in ('script', 'style'):
+            self._skip = max(0, self._skip - 1)
+        elif tag == self._tag:
+            value = ' '.join(self._buffer.split())
+            if tag == 'dt':
+                self._label = value.lower()
+            elif self._label is not None:
+                self.fields.setdefault(self._label, value)
+                self._label = None
+            self._tag = None
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._tag:
+            self._buffer += data
+        if self._rating:
+            self.ratings[self._rating[0]] += data + ' '
+        if self._in_main:
+            self.text.append(data)
+
+
+def parse_certificate_page(html):
+    """Return (summary list fields by lower-case label, rating graph labels, whitespace-normalized text of <main>)"""
+    parser = CertificatePageParser()
+    parser.feed(html or '')
+    parser.close()
+    return parser.fields, parser.ratings, ' '.join(' '.join(parser.text).split())
+
+
+def certificate_metadata(url, html):
+    """RRN, current/potential rating and score, dates and a hash of the visible certificate content"""
+    fields, ratings, text = parse_certificate_page(html)
+    metadata = {key: fields.get(label) for label, key in CERTIFICATE_FIELDS.items()}
+    metadata['rrn'] = metadata['rrn'] or certificate_rrn(url)
+
+    for kind in ('current', 'potential'):
+        label = RATING_LABEL.search(ratings.get(kind, ''))
+        if label:
+            metadata[f'{kind}_score'] = int(label.group(1))
+            metadata[f'{kind}_rating'] = label.group(2)
+        else:
+            # No graph: the rating band is still given in the summary sentence
+            sentence = RATING_SENTENCES[kind].search(text)
+            metadata[f'{kind}_score'] = None
+            metadata[f'{kind}_rating'] = sentence.group(1) if sentence else None
+
+    metadata['content_hash'] = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    metadata['url'] = url
+    return metadata
+
+
+def report_columns(metadata):
+    """Report columns for the certificate fields that were found"""
+    return {column: metadata[key] for key, column in REPORT_COLUMNS.items() if metadata.get(key) is not None}
+
+
+def sidecar_path(output_path):
+    """Metadata file kept next to a saved certificate: 'EPC - ... .pdf' -> 'EPC - ... .pdf.json'"""
+    return output_path + '.json'
+
+
+def read_sidecar(output_path):
+    """Stored metadata for a saved certificate, or None if there is none or it is unreadable"""
+    try:
+        with open(sidecar_path(output_path), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_sidecar(output_path, metadata, logger=None):
+    try:
+        write_atomically(sidecar_path(output_path), json.dumps(metadata, indent=2).encode('utf-8'))
+        return True
+    except Exception as e:
+        (logger or logging.getLogger(__name__)).warning(f"Could not write certificate metadata for {output_path}: {e}")
+        return False
+
+
+def refresh_reason(output_path, metadata):
+    """Why a certificate must be saved again, or None if the file on disk is still current"""
+    if not os.path.exists(output_path):
+        return 'file missing'
+    stored = read_sidecar(output_path)
+    if stored is None:
+        return 'no stored metadata'
+    if stored.get('rrn') != metadata.get('rrn'):
+        return 'new certificate'
+    for key in METADATA_KEYS:
+        if stored.get(key) != metadata.get(key):
+            return f"{key.replace('_', ' ')} changed"
+    return None
+
+
+def table_chunks(results, columns, chunk_rows):
+    """Results as DataFrames of at most chunk_rows rows, with text columns as str or None"""
+    rows = []
+    for result in results:
+        row = []
+        for column in columns:
+            value = result.get(column)
+            if value is not None and pd.isna(value):
+                value = None
+            if value is not None and column not in NUMERIC_TABLE_COLUMNS:
+                value = str(value)
+            row.append(value)
+        rows.append(row)
+        if len(rows) >= chunk_rows:
+            yield pd.DataFrame(rows, columns=columns, dtype=object)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, columns=columns, dtype=object)
+
+
+def write_certificate_table(base_path, results, chunk_rows=TABLE_CHUNK_ROWS):
+    """Write the certificate fields of every row to base_path + .parquet (or .csv without pyarrow).
+
+    Results are expected in spreadsheet order and are written chunk_rows at a time,
+    so the table is never held in memory whole.
+    """
+    columns = TABLE_ROW_COLUMNS + list(REPORT_COLUMNS.values())
+
+    if PYARROW_AVAILABLE:
+        path = base_path + '.parquet'
+        schema = pa.schema([(column, pa.type_for_alias(NUMERIC_TABLE_COLUMNS.get(column, 'string')))
+                            for column in columns])
+        with pq.ParquetWriter(path, schema) as writer:
+            for chunk in table_chunks(results, columns, chunk_rows):
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    else:
+        path = base_path + '.csv'
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            header = True
+            for chunk in table_chunks(results, columns, chunk_rows):
+                chunk.to_csv(f, index=False, header=header)
+                header = False
+            if header:
+                f.write(','.join(columns) + '\n')
+    return path
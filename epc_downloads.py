@@ -0,0 +1,224 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    # watchdog uses inotify on Linux and ReadDirectoryChangesW on Windows
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+MAX_SHARED_CERTIFICATES = 10000  # Saved certificates SharedCertificates remembers for reuse
+
+
+def write_atomically(target_path, data):
+    """Write bytes to target_path via a temp file in the same folder and an atomic rename"""
+    directory = os.path.dirname(os.path.abspath(target_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def link_or_copy(source_path, target_path):
+    """Give target_path the same content as source_path: a hardlink where possible, else a copy.
+
+    The new name appears atomically (temp name + rename), replacing any existing file.
+    """
+    if os.path.abspath(source_path) == os.path.abspath(target_path):
+        return 'same file'
+    directory = os.path.dirname(os.path.abspath(target_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.', suffix='.part')
+    os.close(fd)
+    os.remove(temp_path)
+    try:
+        try:
+            os.link(source_path, temp_path)
+            method = 'hardlink'
+        except OSError:
+            # Different volume, or a filesystem without hardlinks
+            shutil.copy2(source_path, temp_path)
+            method = 'copy'
+        os.replace(temp_path, target_path)
+        return method
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SharedCertificates:
+    """Fetch each certificate once per run; later rows for the same certificate reuse the first row's file.
+
+    claim() returns None when the caller should fetch the certificate (and must
+    then call complete() or fail()), or (path, row) of the row that already
+    saved it. A claim for a certificate another worker is still fetching waits
+    for that fetch, and takes over if it fails. Only the max_entries most
+    recently used saved certificates are remembered, so long runs use constant memory.
+    """
+
+    def __init__(self, max_entries=MAX_SHARED_CERTIFICATES):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.fetching = {}  # key -> (Event set when the fetch ends, row fetching it)
+        self.saved = OrderedDict()  # key -> (saved file, row that fetched it), least recently used first
+        self.reused = 0  # Rows served from another row's download
+
+    def claim(self, key, row):
+        while True:
+            with self.lock:
+                saved = self.saved.get(key)
+                if saved is None or not os.path.exists(saved[0]):
+                    fetching = self.fetching.get(key)
+                    if fetching is None:
+                        self.saved.pop(key, None)
+                        self.fetching[key] = (threading.Event(), row)
+                        return None
+                else:
+                    self.saved.move_to_end(key)
+                    self.reused += 1
+                    return saved
+            fetching[0].wait()
+
+    def complete(self, key, path):
+        with self.lock:
+            done, row = self.fetching.pop(key)
+            if path is not None:
+                self.saved[key] = (path, row)
+                while len(self.saved) > self.max_entries:
+                    self.saved.popitem(last=False)
+        done.set()
+
+    def fail(self, key):
+        with self.lock:
+            done, _ = self.fetching.pop(key)
+        done.set()
+
+
+if WATCHDOG_AVAILABLE:
+    class _WakeOnEvent(FileSystemEventHandler):
+        """Wake the waiting thread whenever anything changes in the download directory"""
+
+        def __init__(self, event):
+            self.event = event
+
+        def on_any_event(self, event):
+            self.event.set()
+
+
+class DownloadWatcher:
+    """Wait for Chrome to finish writing a new PDF into a download directory.
+
+    Call start() before triggering the print, then wait(). The download counts
+    as complete once a new .pdf exists, no .crdownload temp file is left and
+    the PDF size has stopped changing for ``settle_time`` seconds. Filesystem
+    events wake the wait early when watchdog is installed; otherwise the
+    directory is polled every ``poll_interval`` seconds.
+    """
+
+    def __init__(self, directory, timeout=60, settle_time=0.5, poll_interval=0.25, logger=None):
+        self.directory = directory
+        self.timeout = timeout
+        self.settle_time = settle_time
+        self.poll_interval = poll_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self.changed = threading.Event()
+        self.observer = None
+        self.before = set()
+        self.started_at = None
+
+    def start(self):
+        """Remember the files already present and begin watching for changes"""
+        self.before = set(os.listdir(self.directory))
+        self.changed.clear()
+        self.started_at = time.monotonic()
+
+        if WATCHDOG_AVAILABLE:
+            try:
+                self.observer = Observer()
+                self.observer.schedule(_WakeOnEvent(self.changed), self.directory, recursive=False)
+                self.observer.start()
+            except Exception as e:
+                self.logger.warning(f"Filesystem events unavailable, polling download folder instead: {e}")
+                self.observer = None
+
+    def stop(self):
+        if self.observer:
+            try:
+                self.observer.stop()
+                self.observer.join(timeout=2)
+            except Exception:
+                pass
+            self.observer = None
+
+    def _scan(self):
+        """Return (new PDF paths, whether any .crdownload temp files are present)"""
+        new_pdfs = []
+        in_progress = False
+        for name in os.listdir(self.directory):
+            lower = name.lower()
+            if lower.endswith('.crdownload'):
+                in_progress = True
+            elif lower.endswith('.pdf') and name not in self.before:
+                new_pdfs.append(os.path.join(self.directory, name))
+        return new_pdfs, in_progress
+
+    def wait(self):
+        """Block until the new PDF is complete; returns (path or None, seconds waited)"""
+        deadline = self.started_at + self.timeout
+        last_size = None
+        stable_since = None
+
+        try:
+            while True:
+                now = time.monotonic()
+                new_pdfs, in_progress = self._scan()
+
+                if new_pdfs and not in_progress:
+                    newest = max(new_pdfs, key=os.path.getmtime)
+                    try:
+                        size = os.path.getsize(newest)
+                    except OSError:
+                        size = None
+
+                    if size and size == last_size:
+                        if now - stable_since >= self.settle_time:
+                            return newest, now - self.started_at
+                    else:
+                        last_size = size
+                        stable_since = now
+                else:
+                    last_size = None
+                    stable_since = None
+
+                if now >= deadline:
+                    self.logger.warning(f"No completed PDF download after {self.timeout} seconds")
+                    return None, now - self.started_at
+
+                # Sleep until the next filesystem event, the settle window or the poll interval
+                timeout = min(self.poll_interval, deadline - now)
+                if stable_since is not None:
+                    timeout = min(timeout, max(0.0, stable_since + self.settle_time - now))
+                self.changed.wait(timeout)
+                self.changed.clear()
+        finally:
+            self.stop()
@@ -0,0 +1,323 @@
+"""Local stand-in for the gov.uk find-energy-certificate flow.
+
+Serves the start page, the property type (domestic radio) form, the postcode
+search form, the address result list and certificate pages, all generated
+deterministically from the postcode. Point the scraper at it with
+--start-url/--service-url to exercise either backend without touching the
+live service:
+
+    python epc_fake_site.py --port 8765
+
+Latency, jitter, error and throttling rates and the size of the postcode
+result lists are configurable, so benchmarks can model a slow or flaky site:
+
+    python epc_fake_site.py --latency 0.3 --jitter 0.2 --error-rate 0.02 --addresses-per-postcode 5-60
+"""
+import argparse
+import hashlib
+import html
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+START_PATH = "/find-energy-certificate"
+PROPERTY_TYPE_PATH = "/find-a-certificate/type-of-property"
+POSTCODE_SEARCH_PATH = "/find-a-certificate/search-by-postcode"
+CERTIFICATE_PATH = "/energy-certificate/"
+
+BUILDINGS = ["Mallard House", "Heron Court", "Kingfisher Lodge", "Swift House", "Wren Court"]
+STREETS = ["Iris Avenue", "Meadow Way", "Station Road", "Mill Lane", "Orchard Close"]
+RATINGS = [(92, 'A'), (81, 'B'), (69, 'C'), (55, 'D'), (39, 'E'), (21, 'F'), (1, 'G')]
+
+
+def rating_band(score):
+    for threshold, band in RATINGS:
+        if score >= threshold:
+            return band
+    return 'G'
+
+
+def page(title, body):
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{html.escape(title)} - GOV.UK</title></head>
+<body><main class="govuk-main-wrapper">
+{body}
+</main></body>
+</html>"""
+
+
+class FakeEPCData:
+    """Deterministic address lists and certificates generated from the postcode"""
+
+    def __init__(self, addresses_per_postcode=10, town="Canterbury", max_addresses_per_postcode=None):
+        self.addresses_per_postcode = addresses_per_postcode
+        self.max_addresses_per_postcode = max_addresses_per_postcode  # Vary list sizes between the two bounds
+        self.town = town
+        self.certificates = {}
+        self.lock = threading.Lock()
+
+    def _rng(self, *parts):
+        seed = hashlib.sha256('|'.join(str(p) for p in parts).encode()).hexdigest()
+        return random.Random(int(seed[:16], 16))
+
+    def addresses(self, postcode):
+        """Return [(rrn, address)] for a postcode, registering each certificate"""
+        postcode = ' '.join(postcode.upper().split())
+        rng = self._rng(postcode)
+        building = rng.choice(BUILDINGS)
+        street = rng.choice(STREETS)
+        count = self.addresses_per_postcode
+        if self.max_addresses_per_postcode and self.max_addresses_per_postcode > count:
+            count = rng.randint(count, self.max_addresses_per_postcode)
+
+        results = []
+        for i in range(1, count + 1):
+            rrn = '-'.join(f"{self._rng(postcode, i, n).randint(0, 9999):04d}" for n in range(5))
+            address = f"Flat {i}, {building}, {street}, {self.town}, {postcode}"
+            results.append((rrn, address))
+            with self.lock:
+                self.certificates.setdefault(rrn, address)
+        return results
+
+    def certificate(self, rrn):
+        """Return the certificate fields for an RRN, or None if it was never listed"""
+        with self.lock:
+            address = self.certificates.get(rrn)
+        if address is None:
+            return None
+
+        rng = self._rng(rrn)
+        current = rng.randint(55, 85)
+        potential = min(100, current + rng.randint(2, 15))
+        lodged_year = rng.randint(2016, 2025)
+        return {
+            'rrn': rrn,
+            'address': address,
+            'current_score': current,
+            'current_rating': rating_band(current),
+            'potential_score': potential,
+            'potential_rating': rating_band(potential),
+            'assessment_date': f"{rng.randint(1, 27)} March {lodged_year}",
+            'lodgement_date': f"{rng.randint(1, 27)} April {lodged_year}",
+            'expiry_date': f"{rng.randint(1, 27)} April {lodged_year + 10}",
+        }
+
+
+class SiteConditions:
+    """Response latency, jitter and failure rates applied to every request"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, seed=None):
+        self.latency = latency  # Base delay in seconds
+        self.jitter = jitter  # Extra uniformly random delay, 0..jitter seconds
+        self.error_rate = error_rate  # Fraction of requests answered with 500
+        self.throttle_rate = throttle_rate  # Fraction of requests answered with 429
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+
+    def next_response(self):
+        """Return (delay, status) for the next request: status is None for a normal response"""
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self.rng.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                return delay, 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return delay, 500
+            return delay, None
+
+
+class FakeEPCRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real service
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_html(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def redirect(self, location):
+        self.send_response(303)
+        self.send_header('Location', location)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        delay, failure = self.server.conditions.next_response()
+        if delay:
+            time.sleep(delay)
+        if failure == 429:
+            self.send_html(429, page("Too many requests", "<h1>Too many requests</h1>"))
+            return
+        if failure:
+            self.send_html(failure, page("Sorry, there is a problem with the service", "<h1>Sorry, there is a problem with the service</h1>"))
+            return
+
+        parts = urlsplit(self.path)
+        params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        data = self.server.data
+
+        if parts.path in ('/', START_PATH):
+            self.send_html(200, page("Find an energy certificate", f"""
+<h1 class="govuk-heading-xl">Find an energy certificate</h1>
+<a href="{PROPERTY_TYPE_PATH}" role="button" class="govuk-button govuk-button--start">Start now</a>"""))
+
+        elif parts.path == PROPERTY_TYPE_PATH:
+            if params.get('property_type') == 'domestic':
+                self.redirect(f"{POSTCODE_SEARCH_PATH}?property_type=domestic")
+            elif 'property_type' in params:
+                self.send_html(200, page("Non-domestic search", "<h1>Only domestic properties are served here</h1>"))
+            else:
+                self.send_html(200, page("What type of property is the certificate for?", f"""
+<form action="{PROPERTY_TYPE_PATH}" method="get">
+  <div class="govuk-radios__item">
+    <input class="govuk-radios__input" id="domestic" name="property_type" type="radio" value="domestic">
+    <label class="govuk-label govuk-radios__label" for="domestic">Domestic property</label>
+  </div>
+  <div class="govuk-radios__item">
+    <input class="govuk-radios__input" id="non_domestic" name="property_type" type="radio" value="non_domestic">
+    <label class="govuk-label govuk-radios__label" for="non_domestic">Non-domestic property</label>
+  </div>
+  <button type="submit" class="govuk-button">Continue</button>
+</form>"""))
+
+        elif parts.path == POSTCODE_SEARCH_PATH:
+            postcode = params.get('postcode', '').strip()
+            if not postcode:
+                self.send_html(200, page("Enter the postcode", f"""
+<form action="{POSTCODE_SEARCH_PATH}" method="get">
+  <input type="hidden" name="property_type" value="domestic">
+  <label class="govuk-label" for="postcode">Postcode</label>
+  <input class="govuk-input" id="postcode" name="postcode" type="text">
+  <button type="submit" class="govuk-button">Find</button>
+</form>"""))
+                return
+
+            links = '\n'.join(
+                f'  <li><a class="govuk-link" href="{CERTIFICATE_PATH}{rrn}">{html.escape(address)}</a></li>'
+                for rrn, address in data.addresses(postcode)
+            )
+            self.send_html(200, page(f"Energy certificates for {postcode}", f"""
+<h1 class="govuk-heading-l">Energy certificates for {html.escape(postcode)}</h1>
+<ul class="govuk-list">
+{links}
+</ul>
+<p><a class="govuk-link" href="/getting-a-new-energy-certificate">Get a new energy certificate</a></p>"""))
+
+        elif parts.path.startswith(CERTIFICATE_PATH):
+            cert = data.certificate(parts.path[len(CERTIFICATE_PATH):])
+            if cert is None:
+                self.send_html(404, page("Page not found", "<h1>Page not found</h1>"))
+                return
+
+            self.send_html(200, page("Energy performance certificate (EPC)", f"""
+<h1 class="govuk-heading-xl">Energy performance certificate (EPC)</h1>
+<div class="epc-address govuk-body">{html.escape(cert['address'])}</div>
+<dl class="govuk-summary-list epc-rating-box">
+  <div class="govuk-summary-list__row"><dt>Energy rating</dt><dd>{cert['current_rating']}</dd></div>
+  <div class="govuk-summary-list__row"><dt>Valid until</dt><dd>{cert['expiry_date']}</dd></div>
+  <div class="govuk-summary-list__row"><dt>Certificate number</dt><dd>{cert['rrn']}</dd></div>
+</dl>
+<dl class="govuk-summary-list">
+  <div class="govuk-summary-list__row"><dt>Date of assessment</dt><dd>{cert['assessment_date']}</dd></div>
+  <div class="govuk-summary-list__row"><dt>Date of certificate</dt><dd>{cert['lodgement_date']}</dd></div>
+</dl>
+<p class="govuk-body">This property's current energy rating is {cert['current_rating']}. It has the potential to be {cert['potential_rating']}.</p>
+<svg class="rating-current"><text>{cert['current_score']} {cert['current_rating']}</text></svg>
+<svg class="rating-potential"><text>{cert['potential_score']} {cert['potential_rating']}</text></svg>
+<p><a class="govuk-link" href="javascript:window.print()">Print this certificate</a></p>"""))
+
+        else:
+            self.send_html(404, page("Page not found", "<h1>Page not found</h1>"))
+
+
+class FakeEPCSite:
+    """Run the stand-in site on a background thread"""
+
+    def __init__(self, host='127.0.0.1', port=0, addresses_per_postcode=10, max_addresses_per_postcode=None,
+                 latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0, seed=None):
+        self.server = ThreadingHTTPServer((host, port), FakeEPCRequestHandler)
+        self.server.daemon_threads = True
+        self.server.data = FakeEPCData(addresses_per_postcode=addresses_per_postcode,
+                                       max_addresses_per_postcode=max_addresses_per_postcode)
+        self.server.conditions = SiteConditions(latency=latency, jitter=jitter, error_rate=error_rate,
+                                                throttle_rate=throttle_rate, seed=seed)
+        self.thread = None
+
+    @property
+    def conditions(self):
+        return self.server.conditions
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def start_url(self):
+        return self.base_url + START_PATH
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_range(value):
+    """'10' -> (10, None); '5-60' -> (5, 60)"""
+    low, _, high = value.partition('-')
+    return int(low), int(high) if high else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the gov.uk find-energy-certificate flow')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--addresses-per-postcode', type=parse_range, default=(10, None),
+                        help='Addresses listed per postcode, either N or MIN-MAX to vary the list size (default 10)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Base response delay in seconds')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random delay of up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with a 500')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered with a 429')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for latency and failures, for repeatable runs')
+    args = parser.parse_args()
+
+    min_addresses, max_addresses = args.addresses_per_postcode
+    site = FakeEPCSite(args.host, args.port, addresses_per_postcode=min_addresses,
+                       max_addresses_per_postcode=max_addresses, latency=args.latency, jitter=args.jitter,
+                       error_rate=args.error_rate, throttle_rate=args.throttle_rate, seed=args.seed)
+    print(f"Fake EPC site running at {site.base_url}")
+    print(f"  --start-url {site.start_url} --service-url {site.base_url}")
+    try:
+        site.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
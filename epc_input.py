@@ -0,0 +1,135 @@
+import datetime
+import os
+
+import pandas as pd
+
+STREAMABLE_EXTENSIONS = ('.xlsx', '.xlsm', '.csv', '.parquet')
+
+
+def cell_to_text(value):
+    """Turn a spreadsheet cell into text without float artefacts (56540000001.0 -> '56540000001')"""
+    if value is None:
+        return None
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return None
+        if value.is_integer():
+            return str(int(value))
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def _extension(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in STREAMABLE_EXTENSIONS:
+        raise ValueError(f"Streaming input supports {', '.join(STREAMABLE_EXTENSIONS)} files, not '{extension}'")
+    return extension
+
+
+def _parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet files needs pyarrow: pip install pyarrow")
+    return pq
+
+
+def read_columns(path):
+    """Return the header row without loading the data"""
+    extension = _extension(path)
+    if extension == '.csv':
+        return list(pd.read_csv(path, nrows=0).columns)
+    if extension == '.parquet':
+        return list(_parquet().ParquetFile(path).schema_arrow.names)
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        header = next(workbook.active.iter_rows(max_row=1, values_only=True), ())
+        return [cell_to_text(value) for value in header if value is not None]
+    finally:
+        workbook.close()
+
+
+def count_rows(path):
+    """Number of data rows iter_chunks will yield, from file metadata where possible"""
+    extension = _extension(path)
+    if extension == '.parquet':
+        return _parquet().ParquetFile(path).metadata.num_rows
+    if extension == '.csv':
+        # Parse rather than count lines: quoted newlines and skipped blank lines would throw a line count off
+        return sum(len(chunk) for chunk in pd.read_csv(path, usecols=[0], dtype=str, chunksize=100000))
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        next(rows, None)  # Header
+        # max_row also counts formatted empty rows, so count the rows iter_chunks will yield
+        return sum(1 for _ in _trim_trailing_blank_rows(rows))
+    finally:
+        workbook.close()
+
+
+def _trim_trailing_blank_rows(rows):
+    """Yield sheet rows, holding back all-blank rows until a later row has a value.
+
+    Blank rows in the middle are kept so row positions match pd.read_excel; the blank
+    (often just formatted) rows after the last value are dropped, as pandas does.
+    """
+    blank_rows = []
+    for row in rows:
+        if all(value is None for value in row):
+            blank_rows.append(row)
+            continue
+        yield from blank_rows
+        blank_rows = []
+        yield row
+
+
+def iter_chunks(path, columns, chunk_size=1000):
+    """Yield DataFrames of at most chunk_size rows holding only ``columns`` as text.
+
+    The index keeps counting across chunks so it matches the row position in
+    the file, and only one chunk is held in memory at a time.
+    """
+    extension = _extension(path)
+    start = 0
+
+    if extension == '.csv':
+        reader = pd.read_csv(path, usecols=columns, dtype=str, chunksize=chunk_size)
+        for chunk in reader:
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk[columns]
+        return
+
+    if extension == '.parquet':
+        for batch in _parquet().ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            chunk = batch.to_pandas()
+            chunk = pd.DataFrame({col: chunk[col].map(cell_to_text) for col in columns})
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [cell_to_text(value) for value in next(rows, ())]
+        positions = [header.index(col) for col in columns]
+
+        buffer = []
+        for row in _trim_trailing_blank_rows(rows):
+            values = [cell_to_text(row[i]) if i < len(row) else None for i in positions]
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(start, start + len(buffer)), dtype=object)
+                start += len(buffer)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns, index=pd.RangeIndex(start, start + len(buffer)), dtype=object)
+    finally:
+        workbook.close()
@@ -0,0 +1,186 @@
+from array import array
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+
+class RunJournal:
+    """Append-only JSONL journal of processed rows, keyed by spreadsheet row and UPRN and fsynced after every row"""
+
+    def __init__(self, path, resume=False, logger=None, readonly=False, keep_results=True):
+        self.path = path
+        self.keep_results = keep_results  # False: hold only where each row's line starts, entries stay on disk
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.entries = {}  # key -> latest entry for that row (rows without a row number when not keeping results)
+        self.offsets = array('q')  # row -> byte offset of its latest line, or -1, when not keeping results
+        self.row_count = 0
+        self.meta = {}  # Run information (spreadsheet path, start time)
+        self.file = None
+
+        if readonly:
+            self.load()
+            return
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if os.path.exists(path):
+            if resume:
+                self.load()
+            else:
+                # Fresh run: keep the previous journal for reference rather than appending to it
+                archived = f"{path}.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                os.replace(path, archived)
+                self.logger.info(f"Archived previous run journal to: {archived}")
+
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def load(self):
+        """Read the existing journal, ignoring a torn final line from a crash mid-write"""
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for line_number, line in enumerate(f, start=1):
+                line_offset = offset
+                offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    self.logger.warning(f"Skipping unreadable journal line {line_number} in {self.path}")
+                    continue
+                if entry.get('type') == 'run':
+                    self.meta.update(entry.get('meta') or {})
+                    continue
+                self._remember(entry, line_offset)
+        self.logger.info(f"Loaded {self.row_count} rows from run journal: {self.path}")
+
+    def write_meta(self, **meta):
+        """Record run information so a report can be rendered from the journal alone"""
+        self.meta.update(meta)
+        self._write({'type': 'run', 'meta': meta})
+
+    def _write(self, entry):
+        """Append one line and fsync it; returns the line's byte offset in the file"""
+        line = json.dumps(entry, default=str)
+        with self.lock:
+            offset = self.file.tell()
+            self.file.write(line + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        return offset
+
+    def append(self, key, uprn, status, matched_address=None, certificate_href=None, output_file=None, result=None,
+               row=None):
+        """Record one row and flush it to disk before returning"""
+        entry = {
+            'key': key,
+            'row': row,
+            'uprn': uprn,
+            'status': status,
+            'matched_address': matched_address,
+            'certificate_href': certificate_href,
+            'output_file': output_file,
+            'written_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'result': result,
+        }
+        offset = self._write(entry)
+        with self.lock:
+            self._remember(entry, offset)
+
+    def _remember(self, entry, offset):
+        """Index an entry: the whole entry, or for memory-bounded runs just its line's offset by row"""
+        row = entry.get('row')
+        if self.keep_results or row is None:
+            if entry['key'] not in self.entries:
+                self.row_count += 1
+            self.entries[entry['key']] = entry
+            return
+        if row >= len(self.offsets):
+            self.offsets.extend([-1] * (row + 1 - len(self.offsets)))
+        if self.offsets[row] < 0:
+            self.row_count += 1
+        self.offsets[row] = offset
+
+    def _read_entry(self, offset, f=None):
+        """The entry whose line starts at offset, or None if it cannot be read"""
+        if f is None:
+            with open(self.path, 'rb') as f:
+                return self._read_entry(offset, f)
+        f.seek(offset)
+        try:
+            return json.loads(f.readline())
+        except ValueError:
+            return None
+
+    def entry(self, key, row=None):
+        """Latest entry recorded under key (memory-bounded runs look it up on disk by row)"""
+        entry = self.entries.get(key)
+        if entry or self.keep_results or row is None or row >= len(self.offsets) or self.offsets[row] < 0:
+            return entry
+        entry = self._read_entry(self.offsets[row])
+        # A different key on this row means the spreadsheet changed since the row was journaled
+        return entry if entry and entry.get('key') == key else None
+
+    def completed_entry(self, key, output_file=None, require_file=True, row=None):
+        """Return the journal entry if this row finished successfully and its output file still exists.
+
+        output_file is the path to check, defaulting to the one the entry recorded. With
+        require_file=False (data-only runs) a successful row without an output file also counts.
+        row is the entry's spreadsheet row, needed to find it when results are not kept in memory.
+        """
+        entry = self.entry(key, row)
+        if not entry or entry['status'] != 'Success':
+            return None
+        if not entry.get('output_file'):
+            return None if require_file else entry
+        if not os.path.exists(output_file or entry['output_file']):
+            return None
+        return entry
+
+    def iter_results(self):
+        """Latest result of every journaled row in spreadsheet order, read back one line at a time when not kept in memory"""
+        with self.lock:
+            entries = sorted(self.entries.values(), key=lambda entry: entry.get('row') or 0)
+        for entry in entries:
+            if entry.get('result'):
+                yield entry['result']
+        if self.keep_results:
+            return
+
+        # Results were not kept in memory: the offsets are already in row order
+        with open(self.path, 'rb') as f:
+            for row in range(len(self.offsets)):
+                offset = self.offsets[row]
+                if offset < 0:
+                    continue
+                entry = self._read_entry(offset, f)
+                if entry and entry.get('result'):
+                    yield entry['result']
+
+    def results(self):
+        """Latest result entry of every journaled row"""
+        return list(self.iter_results())
+
+    def result_count(self):
+        with self.lock:
+            return self.row_count
+
+    def close(self):
+        with self.lock:
+            if self.file and not self.file.closed:
+                self.file.close()
+
+
+class JournalResults:
+    """The journal's results as a collection that reads them back from disk on every pass"""
+
+    def __init__(self, journal):
+        self.journal = journal
+
+    def __iter__(self):
+        return self.journal.iter_results()
+
+    def __bool__(self):
+        return self.journal.result_count() > 0
@@ -0,0 +1,149 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Compiled once at import instead of on every comparison
+PROPERTY_NUMBER_PATTERNS = [
+    re.compile(r'\b(?:flat|apartment|apt|unit)\s*(\d+)\b'),  # "Flat 9"
+    re.compile(r'\b(\d+)\s+(?:flat|apartment|apt|unit)\b'),  # "9 Flat"
+    re.compile(r'^(\d+)\s+\w+'),  # "9 HOUSE" at start
+    re.compile(r'\b(\d+)\s*[,\s]'),  # Any number followed by comma or space
+]
+LEADING_NUMBER = re.compile(r'^\d+\s*')
+UNIT_PREFIX_WITH_NUMBER = re.compile(r'\b(?:flat|apartment|apt|unit)\s*\d+[,\s]*', re.IGNORECASE)
+UNIT_PREFIX = re.compile(r'\b(flat|apartment|apt|unit)\s*')
+BUILDING_PUNCTUATION = re.compile(r'[,\.]')
+PUNCTUATION = re.compile(r'[,\.\-\(\)]')
+WHITESPACE = re.compile(r'\s+')
+STOP_WORDS = frozenset(['the', 'and', 'of', 'in', 'at', 'to', 'for', 'with', 'by'])
+
+HIGH_CONFIDENCE_SCORE = 0.8
+MINIMUM_MATCH_SCORE = 0.3
+
+
+def normalize_address_for_matching(address):
+    """Normalize address text for better matching"""
+    if not address:
+        return ""
+
+    normalized = address.lower()
+    normalized = UNIT_PREFIX.sub('', normalized)
+    normalized = PUNCTUATION.sub(' ', normalized)
+    normalized = WHITESPACE.sub(' ', normalized).strip()
+    return ' '.join(word for word in normalized.split() if word not in STOP_WORDS)
+
+
+def extract_property_number(address):
+    """Extract property number from address"""
+    lower = address.lower()
+    for pattern in PROPERTY_NUMBER_PATTERNS:
+        match = pattern.search(lower)
+        if match:
+            return match.group(1)
+    return None
+
+
+def extract_building_name(address):
+    """Extract building name from address"""
+    cleaned = LEADING_NUMBER.sub('', address)
+    cleaned = UNIT_PREFIX_WITH_NUMBER.sub('', cleaned)
+
+    parts = [part.strip() for part in cleaned.split(',') if part.strip()]
+    if parts:
+        return BUILDING_PUNCTUATION.sub('', parts[0].strip()).lower()
+    return ""
+
+
+# Everything the score needs from one side of a comparison
+AddressFeatures = namedtuple('AddressFeatures', ['text', 'lower', 'number', 'building', 'building_words', 'words'])
+
+
+@lru_cache(maxsize=16384)
+def address_features(text):
+    """Extract and cache the matching features of an address string"""
+    building = extract_building_name(text)
+    return AddressFeatures(
+        text=text,
+        lower=text.lower(),
+        number=extract_property_number(text),
+        building=building,
+        building_words=frozenset(building.split()),
+        words=frozenset(normalize_address_for_matching(text).split()),
+    )
+
+
+def score_features(target, option):
+    """Score precomputed features; same arithmetic as the scraper's enhanced address match score"""
+    score = 0.0
+
+    # Property number matching (high weight)
+    if target.number and option.number:
+        if target.number == option.number:
+            score += 0.4  # Strong match for same number
+        else:
+            score -= 0.3  # Penalty for different numbers
+    elif target.number or option.number:
+        score -= 0.1  # Small penalty if only one has a number
+
+    # Building name matching (high weight)
+    if target.building and option.building:
+        if target.building in option.building or option.building in target.building:
+            score += 0.4
+        else:
+            # Check for partial matches
+            common_building_words = target.building_words & option.building_words
+            if common_building_words:
+                score += 0.2 * len(common_building_words) / max(len(target.building_words), len(option.building_words))
+
+    # Overall word matching (medium weight)
+    if len(target.words) > 0:
+        score += 0.2 * (len(target.words & option.words) / len(target.words))
+
+    # Substring matching for exact phrases (low weight)
+    if target.building and target.building in option.lower:
+        score += 0.1
+
+    return max(0.0, min(1.0, score))  # Clamp between 0 and 1
+
+
+def is_selectable(candidate):
+    """Skip empty links and the 'Get a new energy certificate' link"""
+    text = candidate['text']
+    return bool(text) and "get a new energy certificate" not in text.lower()
+
+
+class AddressMatcher:
+    """Score a postcode's rows against its candidate address list in one batch"""
+
+    def score_batch(self, targets, candidates):
+        """Return a score row per target, with one score per candidate (None for unselectable links)"""
+        option_features = [address_features(c['text']) if is_selectable(c) else None for c in candidates]
+        return [
+            [score_features(target_features, option) if option is not None else None for option in option_features]
+            for target_features in (address_features(t) for t in targets)
+        ]
+
+    def select(self, scores, candidates):
+        """Pick (candidate, score) from one row of scores, using the scraper's selection rules"""
+        best_index = None
+        best_score = 0
+        for i, score in enumerate(scores):
+            if score is not None and score > best_score:
+                best_score = score
+                best_index = i
+
+        # The first candidate with the top score wins, whether high-confidence or best-above-threshold
+        if best_index is not None and (best_score >= HIGH_CONFIDENCE_SCORE or best_score > MINIMUM_MATCH_SCORE):
+            return candidates[best_index], best_score, 'high' if best_score >= HIGH_CONFIDENCE_SCORE else 'best'
+
+        # Fallback to first address if no good matches
+        if candidates:
+            return candidates[0], 0.0, 'fallback'
+        return None, 0.0, 'none'
+
+    def best_matches(self, targets, candidates):
+        """Return [(candidate, score, kind)] for every target against a shared candidate list"""
+        return [self.select(scores, candidates) for scores in self.score_batch(targets, candidates)]
+
+    def best_match(self, target, candidates):
+        return self.best_matches([target], candidates)[0]
@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+
+STOP = object()  # End-of-input marker passed down the pipeline
+
+
+class StageQueue(queue.Queue):
+    """Bounded queue that remembers its peak depth"""
+
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.peak = 0
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        if item is not STOP:
+            depth = self.qsize()
+            if depth > self.peak:
+                self.peak = depth
+
+
+class Stage:
+    """A pipeline stage: one thread per context, each taking items from the stage's inbox.
+
+    ``handler(item, context)`` returns the items to pass to the next stage (an
+    iterable, possibly empty). The context is per thread, e.g. the browser
+    session that thread owns. When the handler raises, ``on_error(item, error,
+    context)`` returns items for the error stage instead (e.g. failed results
+    for the last stage), so a failed item is still accounted for.
+    """
+
+    def __init__(self, name, handler, contexts, inbox, on_error=None, logger=None):
+        self.name = name
+        self.handler = handler
+        self.on_error = on_error
+        self.contexts = list(contexts)
+        self.inbox = inbox
+        self.next_stage = None
+        self.error_stage = None  # Where on_error's items go
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.finished = 0
+        self.errors = 0
+        self.threads = [threading.Thread(target=self._run, args=(context,), name=f"{name}-{number}", daemon=True)
+                        for number, context in enumerate(self.contexts, start=1)]
+
+    def _run(self, context):
+        try:
+            while True:
+                item = self.inbox.get()
+                if item is STOP:
+                    break
+                try:
+                    outputs = self.handler(item, context) or ()
+                except Exception as e:
+                    with self.lock:
+                        self.errors += 1
+                    self.logger.error(f"Pipeline stage '{self.name}' failed on an item: {e}")
+                    self._route_error(item, e, context)
+                    continue
+                if self.next_stage:
+                    for output in outputs:
+                        # Blocks while the next stage is behind, which holds this stage back too
+                        self.next_stage.inbox.put(output)
+        finally:
+            with self.lock:
+                self.finished += 1
+                last = self.finished == len(self.threads)
+            if last and self.next_stage:
+                self.next_stage.stop()
+
+    def _route_error(self, item, error, context):
+        if not self.on_error:
+            return
+        try:
+            outputs = self.on_error(item, error, context) or ()
+        except Exception as e:
+            self.logger.error(f"Pipeline stage '{self.name}' could not report a failed item: {e}")
+            return
+        # Queued before this stage can finish, so ahead of the end-of-input marker downstream
+        target = self.error_stage or self.next_stage
+        if target:
+            for output in outputs:
+                target.inbox.put(output)
+
+    def start(self):
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self):
+        """Let every thread finish the items already queued, then exit"""
+        for _ in self.threads:
+            self.inbox.put(STOP)
+
+    def is_alive(self):
+        return any(thread.is_alive() for thread in self.threads)
+
+
+class Pipeline:
+    """Stages connected by bounded queues: a full queue blocks the stage feeding it (backpressure)"""
+
+    def __init__(self, queue_size=50, logger=None):
+        self.queue_size = queue_size
+        self.logger = logger or logging.getLogger(__name__)
+        self.stages = []
+
+    def add_stage(self, name, handler, contexts, on_error=None):
+        stage = Stage(name, handler, contexts, StageQueue(self.queue_size), on_error=on_error, logger=self.logger)
+        if self.stages:
+            self.stages[-1].next_stage = stage
+        self.stages.append(stage)
+        for earlier in self.stages[:-1]:
+            earlier.error_stage = stage  # Failed items skip ahead to the last stage
+        return stage
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def feed(self, item):
+        """Queue an item for the first stage, waiting while that stage is behind"""
+        self.stages[0].inbox.put(item)
+
+    def finish(self, poll_seconds=0.5):
+        """Signal the end of input and wait for every stage to drain"""
+        self.stages[0].stop()
+        for stage in self.stages:
+            # Short joins keep the main thread responsive to Ctrl+C
+            while stage.is_alive():
+                for thread in stage.threads:
+                    thread.join(poll_seconds)
+
+    def depths(self):
+        """Items currently waiting in front of each stage"""
+        return {stage.name: stage.inbox.qsize() for stage in self.stages}
+
+    def peak_depths(self):
+        return {stage.name: stage.inbox.peak for stage in self.stages}
+
+    def describe(self):
+        """'lookup x2, match x1, ...' - each stage with its concurrency"""
+        return ', '.join(f"{stage.name} x{len(stage.threads)}" for stage in self.stages)
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class JobQueue:
+    """Lease-based queue of spreadsheet rows in a SQLite file, shared by any number of worker processes.
+
+    A worker claims a batch of rows with a lease that expires after ``lease_seconds``.
+    Writing a row's result extends the worker's remaining leases, so only a worker
+    that has stopped making progress loses its rows. Expired leases are claimed again
+    by the next worker, up to ``max_attempts`` times per row.
+    """
+
+    def __init__(self, db_path, lease_seconds=300, max_attempts=3, logger=None):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()  # One connection shared by this process's threads
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Autocommit mode: claims take the write lock explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, timeout=60, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                position INTEGER PRIMARY KEY,
+                postcode_key TEXT,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, postcode_key, position)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    def _transaction(self, work):
+        """Run work(conn) inside BEGIN IMMEDIATE ... COMMIT, so only one process writes at a time"""
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self.conn)
+                self.conn.execute("COMMIT")
+                return result
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    def set_meta(self, **values):
+        def write(conn):
+            for key, value in values.items():
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+        self._transaction(write)
+
+    def meta(self):
+        with self.lock:
+            rows = self.conn.execute("SELECT key, value FROM meta").fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    def enqueue(self, jobs):
+        """Add rows as (position, postcode_key, payload dict); rows already queued are left alone"""
+        now = time.time()
+
+        def insert(conn):
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (position, postcode_key, payload, updated_at) VALUES (?, ?, ?, ?)",
+                [(position, postcode_key, json.dumps(payload, default=str), now)
+                 for position, postcode_key, payload in jobs]
+            )
+            return conn.total_changes - before
+        return self._transaction(insert)
+
+    def claim(self, owner, limit):
+        """Lease up to ``limit`` pending or abandoned rows to ``owner``, keeping postcodes together.
+
+        Returns [(position, payload dict)].
+        """
+        now = time.time()
+
+        def take(conn):
+            # Rows whose lease ran out too often are given up on rather than crashing worker after worker
+            conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, updated_at = ? "
+                "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT position, payload FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY postcode_key, position LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE position = ?",
+                [(owner, now + self.lease_seconds, now, position) for position, _ in rows]
+            )
+            return [(position, json.loads(payload)) for position, payload in rows]
+        return self._transaction(take)
+
+    def complete(self, position, owner, result):
+        """Store a row's result and extend the owner's other leases; False if the lease was lost"""
+        now = time.time()
+
+        def finish(conn):
+            updated = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, lease_owner = NULL, updated_at = ? "
+                "WHERE position = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result, default=str), now, position, owner)
+            ).rowcount
+            conn.execute("UPDATE jobs SET lease_expires = ? WHERE status = 'leased' AND lease_owner = ?",
+                         (now + self.lease_seconds, owner))
+            return updated == 1
+        done = self._transaction(finish)
+        if not done:
+            self.logger.warning(f"Lease on row {position + 1} expired before its result was saved; another worker has it")
+        return done
+
+    def release(self, owner):
+        """Hand the owner's unfinished rows back to the queue (on shutdown)"""
+        def give_back(conn):
+            return conn.execute(
+                "UPDATE jobs SET status = 'pending', lease_owner = NULL, lease_expires = NULL, "
+                "attempts = MAX(attempts - 1, 0), updated_at = ? WHERE status = 'leased' AND lease_owner = ?",
+                (time.time(), owner)
+            ).rowcount
+        released = self._transaction(give_back)
+        if released:
+            self.logger.info(f"Released {released} unfinished rows back to the queue")
+        return released
+
+    def counts(self):
+        """Rows per status: pending, leased, done, failed"""
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        counts.update(dict(rows))
+        return counts
+
+    def next_lease_expiry(self):
+        """When the earliest lease held by any worker runs out, or None if no rows are leased"""
+        with self.lock:
+            return self.conn.execute("SELECT MIN(lease_expires) FROM jobs WHERE status = 'leased'").fetchone()[0]
+
+    def rows(self):
+        """Every row in spreadsheet order as (position, payload, status, attempts, result or None)"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT position, payload, status, attempts, result FROM jobs ORDER BY position"
+            ).fetchall()
+        for position, payload, status, attempts, result in rows:
+            yield position, json.loads(payload), status, attempts, json.loads(result) if result else None
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class RequestSlot:
+    """One request holding a rate limiter slot; set ``status`` once the response is known"""
+
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.status = None
+        self.started = None
+
+    def __enter__(self):
+        self.started = self.limiter.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.limiter.release(self.started, status=self.status, error=exc_type is not None)
+        return False
+
+
+class RateLimiter:
+    """Token bucket (requests per second) plus a cap on requests in flight, shared by every worker.
+
+    The in-flight cap adapts AIMD-style: it grows by about one per window of
+    healthy responses and halves on an error, a slow response or throttling.
+    A 429/503 also halves the request rate, which then recovers gradually.
+    ``rate=None`` disables limiting.
+    """
+
+    def __init__(self, rate=1.0, burst=2, max_in_flight=1, target_latency=5.0, logger=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = rate / 8 if rate else None
+        self.burst = max(1, burst)
+        self.max_in_flight = max(1, max_in_flight)
+        self.limit = float(self.max_in_flight)
+        self.target_latency = target_latency
+        self.logger = logger or logging.getLogger(__name__)
+
+        self.tokens = float(self.burst)
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+        self.last_decrease = 0.0
+        self.condition = threading.Condition()
+
+        self.requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self.slow = 0
+
+    def request(self):
+        """Context manager around one navigation or HTTP request"""
+        return RequestSlot(self)
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def acquire(self):
+        """Wait for a free in-flight slot and a token; returns the request's start time"""
+        if not self.rate:
+            return time.monotonic()
+
+        with self.condition:
+            while self.in_flight >= int(self.limit):
+                self.condition.wait()
+            self.in_flight += 1
+            now = time.monotonic()
+            self._refill(now)
+            # Tokens may go negative: callers queue up behind earlier reservations
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if delay:
+            time.sleep(delay)
+        return time.monotonic()
+
+    def release(self, started, status=None, error=False):
+        """Free the slot and adapt the limits from the request's outcome"""
+        if not self.rate:
+            return
+
+        now = time.monotonic()
+        latency = now - started
+        throttled = status in THROTTLE_STATUSES
+        slow = latency > self.target_latency
+
+        with self.condition:
+            self.in_flight -= 1
+            self.requests += 1
+            self.throttled += throttled
+            self.errors += error
+            self.slow += slow
+
+            if throttled or error or slow:
+                # Multiplicative decrease, at most once per latency window so one bad burst halves once
+                if now - self.last_decrease > max(latency, 1.0):
+                    self.last_decrease = now
+                    self.limit = max(1.0, self.limit / 2)
+                    if throttled:
+                        self.rate = max(self.min_rate, self.rate / 2)
+                    reason = 'throttled' if throttled else 'error' if error else f'slow ({latency:.1f}s)'
+                    self.logger.warning(f"Backing off after {reason} response: "
+                                        f"{int(self.limit)} in flight, {self.rate:.2f} req/s")
+            else:
+                # Additive increase: about +1 in flight per window of healthy responses
+                self.limit = min(float(self.max_in_flight), self.limit + 1 / self.limit)
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+            self.condition.notify_all()
+
+    def stats(self):
+        """Counters and current limits for the run summary"""
+        with self.condition:
+            return {
+                'requests': self.requests,
+                'throttled': self.throttled,
+                'errors': self.errors,
+                'slow': self.slow,
+                'rate': round(self.rate, 3) if self.rate else None,
+                'in_flight_limit': int(self.limit),
+            }
@@ -8,26 +8,215 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 import re
 import sys
 from pathlib import Path
+from urllib.parse import urlencode
 import xlsxwriter
 import argparse
 import signal
 import atexit
+import base64
+import threading
+import queue
+import socket
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from epc_cache import PostcodeSearchCache, CertificateIndex
+from epc_backends import SeleniumBackend, HttpBackend, GOV_UK_START_URL, EPC_SERVICE_URL, POSTCODE_SEARCH_PATH, certificate_rrn
+from epc_downloads import DownloadWatcher, SharedCertificates, link_or_copy, write_atomically
+from epc_certificate import (certificate_metadata, read_sidecar, refresh_reason, report_columns, sidecar_path,
+                             write_certificate_table, write_sidecar)
+from epc_journal import RunJournal, JournalResults
+from epc_ratelimit import RateLimiter
+from epc_timing import StageTimer, MetricsServer
+from epc_browser import BrowserHealthMonitor, ProfileSlot
+from epc_selectors import SelectorRegistry
+from epc_pipeline import Pipeline
+from epc_queue import JobQueue
+import epc_input
+import epc_matching
+from epc_matching import AddressMatcher
+
+
+def normalize_uprn(uprn):
+    """Normalize a UPRN read from a spreadsheet (e.g. 56540000001.0) to a plain digit string"""
+    value = str(uprn).strip()
+    if value.lower() in ('', 'nan', 'none'):
+        return ''
+    if value.endswith('.0') and value[:-2].isdigit():
+        value = value[:-2]
+    return value
+
+
+def normalize_postcode(postcode):
+    """Normalize a UK postcode to upper case with a single space before the inward code"""
+    compact = re.sub(r'\s+', '', str(postcode)).upper()
+    if len(compact) > 3:
+        return f"{compact[:-3]} {compact[-3:]}"
+    return compact
+
+
+# One spreadsheet row, precomputed before any network work
+PropertyJob = namedtuple('PropertyJob', [
+    'index', 'full_address', 'postcode', 'postcode_key', 'filename', 'uprn', 'extras'
+])
+
+# Requests blocked on the search pages by the performance browser profile (certificate pages load everything)
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico',  # Images
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',  # Fonts
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',  # Tracking
+    '*analytics*.js', '*gtm.js*',
+]
+
+# Locator strategies for each page step, in default order: (name, expected condition, locator).
+# The selector registry moves the one that last worked to the front.
+DOMESTIC_OPTION_STRATEGIES = [
+    ('label_for', EC.element_to_be_clickable, (By.XPATH, "//label[@for='domestic']")),
+    ('label_text', EC.element_to_be_clickable, (By.XPATH, "//label[contains(text(), 'Domestic') or contains(text(), 'domestic')]")),
+    ('radio_js', EC.presence_of_element_located, (By.ID, "domestic")),  # Hidden radio, clicked with JavaScript
+    ('container', EC.element_to_be_clickable, (By.XPATH, "//div[.//input[@id='domestic']]")),
+]
+CONTINUE_BUTTON_STRATEGIES = [
+    ('continue_text', EC.element_to_be_clickable, (By.XPATH, "//button[contains(text(), 'Continue')]")),
+    ('next_text', EC.element_to_be_clickable, (By.XPATH, "//button[contains(text(), 'Next')]")),
+    ('submit_button', EC.element_to_be_clickable, (By.XPATH, "//button[@type='submit']")),
+]
+FIND_BUTTON_STRATEGIES = [
+    ('find_text', EC.element_to_be_clickable, (By.XPATH, "//button[contains(text(), 'Find')]")),
+    ('find_address_text', EC.element_to_be_clickable, (By.XPATH, "//button[contains(text(), 'Find address')]")),
+    ('govuk_button', EC.element_to_be_clickable, (By.XPATH, "//button[@class='govuk-button']")),
+]
+PRINT_LINK_STRATEGIES = [
+    ('print_link', EC.element_to_be_clickable, (By.XPATH, "//a[contains(text(), 'Print') or contains(@href, 'print')]")),
+    ('print_button', EC.element_to_be_clickable, (By.XPATH, "//button[contains(text(), 'Print')]")),
+]
+
+# Settle sleep the old page-load wait added after every readyState check
+LEGACY_SETTLE_SECONDS = 1.0
+
+# Matches at or above this score are reported as High Confidence and added to the UPRN index
+HIGH_CONFIDENCE_SCORE = 0.8
+
+# Text on a certificate page that means a newer certificate has replaced it
+SUPERSEDED_MARKERS = ['newer certificate', 'superseded']
+
+# Besides the postcode and address columns, the only columns a streamed run reads
+STREAM_EXTRA_COLUMNS = ['Town', 'UPRN', 'Scheme Abbreviation', 'Development Plot Number', 'Tenure']
+
+
+def clean_text_column(df, col, missing=''):
+    """Vectorized str(value).strip() with empty and 'nan' values replaced by ``missing``"""
+    if col not in df.columns:
+        return pd.Series(missing, index=df.index, dtype=object)
+    values = df[col].fillna('').astype(str).str.strip()
+    return values.mask((values == '') | (values.str.lower() == 'nan'), missing)
+
 
 class EPCCertificateScraper:
-    def __init__(self, download_dir="C:\\Users\\IS19\\Documents\\EPC_Scraper\\Processed"):
+    def __init__(self, download_dir="C:\\Users\\IS19\\Documents\\EPC_Scraper\\Processed", batch_by_postcode=False,
+                 use_cache=True, cache_ttl_hours=168, cache_max_entries=5000,
+                 backend='selenium', start_url=GOV_UK_START_URL, service_url=EPC_SERVICE_URL,
+                 workers=1, rate_limit=1.0, burst=2, max_in_flight=None, target_latency=5.0, download_timeout=60, pdf_mode='print', deep_link=False, resume=False,
+                 stream_input=False, chunk_size=1000, browser_profile='default', recycle_every=200, max_browser_mb=1500, selector_probe_timeout=3,
+                 dedupe_certificates=True, use_uprn_index=True, refresh=False, data_only=False,
+                 pipeline=False, lookup_workers=1, match_workers=1, queue_size=50, queue_worker=False,
+                 worker_id=None, parent=None):
         self.download_dir = download_dir
+        self.output_dir = parent.download_dir if parent else download_dir  # Where renamed PDFs end up
+        self.start_url = start_url  # gov.uk start page (or a local stand-in)
+        self.service_url = service_url  # find-energy-certificate service used by the HTTP backend
+        self.batch_by_postcode = batch_by_postcode  # Search each postcode once and reuse the result list
+        self.backend_name = backend
+        self.workers = workers
+        self.download_timeout = download_timeout  # Upper bound on waiting for a printed PDF
+        self.pdf_mode = pdf_mode  # 'print' (kiosk print + download folder) or 'devtools' (Page.printToPDF)
+        self.deep_link = deep_link  # Go straight to the postcode results URL instead of clicking through
+        self.session_established = False
+        self.deep_link_failures = 0
+        self.resume = resume  # Skip rows the run journal already records as done
+        self.stream_input = stream_input  # Read the spreadsheet in chunks and keep results on disk only
+        self.chunk_size = chunk_size
+        self.browser_profile = browser_profile  # 'default' (visible Chrome) or 'performance' (lean headless)
+        self.resources_blocked = False
+        self.recycle_every = recycle_every  # Restart Chrome every N rows (0: never)
+        self.max_browser_mb = max_browser_mb  # Restart Chrome above this RSS (0: no limit)
+        self.browser_health = None
+        self.selector_probe_timeout = selector_probe_timeout  # Short wait for any known selector before the long wait
+        self.dedupe_certificates = dedupe_certificates  # Fetch each certificate once, link it for other rows
+        self.row_index = None  # Spreadsheet index of the row being processed
+        self.claimed_certificate = None  # Certificate key this row is fetching for the run
+        self.shared_from = None  # (path, row index) of an earlier row's copy of this row's certificate
+        self.refresh = refresh  # Only save certificates whose metadata changed since the last run
+        self.data_only = data_only  # Read the certificate fields into the report without saving PDFs
+        self.pipeline = pipeline  # Run lookup, match, certificate and record as separate stages
+        self.lookup_workers = lookup_workers  # Sessions that only search postcodes (pipeline mode)
+        self.match_workers = match_workers
+        self.queue_size = queue_size  # Bound on the queue in front of each pipeline stage
+        self.lookup_scrapers = []
+        self.active_pipeline = None
+        self.peak_queue_depths = {}
+        self.queue_worker = queue_worker  # Take rows from a shared job queue instead of a spreadsheet
+        self.job_queue = None
+        self.queue_owner = f"{socket.gethostname()}:{os.getpid()}"  # Lease holder name in the job queue
+        # Several worker processes can share one download folder: keep their sessions' folders apart
+        self.session_prefix = parent.session_prefix if parent else (
+            f"{socket.gethostname()}_{os.getpid()}_" if queue_worker else "")
+        self.profile_slot = None  # Per-host profile slot of a --worker process, shared by its sessions
+        if browser_profile == 'performance' and pdf_mode == 'print':
+            # Kiosk printing needs a visible browser; headless Chrome renders PDFs through DevTools
+            self.pdf_mode = 'devtools'
+        self.matcher = AddressMatcher()
+        self.journal = None
+        self.row_metrics = {}  # Per-row measurements added as report columns
+        self.worker_scrapers = []
+        self.worker_id = worker_id
+        self.worker_label = f" [worker {worker_id}]" if worker_id else ""
         self.original_spreadsheet_data = None  # Store original data for report
         self.spreadsheet_filepath = None  # Store original file path
-        self.setup_logging()
-        self.setup_driver()
+        self.results_lock = threading.Lock()
+        self.report_path = None  # Set once the final report has been rendered
+        
+        if parent:
+            # Worker session: share the coordinator's logger, cache and rate limiter
+            self.logger = parent.logger
+            self.cache = parent.cache
+            self.rate_limiter = parent.rate_limiter
+            self.timer = parent.timer
+            self.selectors = parent.selectors
+            self.shared_certificates = parent.shared_certificates
+            self.certificate_index = parent.certificate_index
+            self.profile_slot = parent.profile_slot
+        else:
+            self.setup_logging()
+            self.setup_cache(use_cache, cache_ttl_hours, cache_max_entries, use_uprn_index)
+            # Every navigation goes through one limiter, so the limits hold across all workers
+            self.rate_limiter = RateLimiter(rate=rate_limit, burst=burst,
+                                            max_in_flight=max_in_flight or self.page_sessions(),
+                                            target_latency=target_latency, logger=self.logger)
+            self.timer = StageTimer()  # Per-stage durations for the Timings sheet and metrics export
+            self.selectors = SelectorRegistry(os.path.join(os.path.dirname(self.download_dir), "cache", "selectors.json"),
+                                              logger=self.logger)
+            self.shared_certificates = SharedCertificates() if dedupe_certificates else None
+            if queue_worker and browser_profile == 'performance':
+                # Profiles are named by slot rather than pid so the next run's workers reuse their disk caches
+                self.profile_slot = ProfileSlot(os.path.join(os.path.dirname(self.output_dir), "chrome_profile"))
+        
+        if parent or (workers <= 1 and not pipeline and not queue_worker):
+            self.setup_backend(backend)
+        else:
+            # Coordinator in --workers, --pipeline or --worker mode: each worker opens its own browser session
+            self.backend = None
+        
         self.success_count = 0
         self.failure_count = 0
+        self.index_hits = 0  # Rows that went straight to an indexed certificate
+        self.index_stale = 0  # Indexed certificates that failed validation and were searched again
+        self.refresh_unchanged = 0  # Certificates --refresh found unchanged and did not save again
         self.results = []
-        self.cleanup_registered = False
+        self.cleanup_registered = parent is not None  # Workers are cleaned up by their coordinator
         
         # Register cleanup function to run on exit
         if not self.cleanup_registered:
@@ -53,6 +242,46 @@ class EPCCertificateScraper:
         self.logger = logging.getLogger(__name__)
         self.logger.info(f"Starting EPC Certificate Scraper - Log file: {log_filename}")
         
+    def setup_cache(self, use_cache, ttl_hours, max_entries, use_uprn_index=True):
+        """Open the on-disk postcode search cache and UPRN index (next to the logs directory)"""
+        self.cache = None
+        self.certificate_index = None
+        if not use_cache:
+            return
+        
+        cache_path = os.path.join(os.path.dirname(self.download_dir), "cache", "postcode_cache.sqlite3")
+        try:
+            self.cache = PostcodeSearchCache(cache_path, ttl_hours=ttl_hours, max_entries=max_entries, logger=self.logger)
+            self.logger.info(f"Using postcode cache: {cache_path} (TTL {ttl_hours}h, max {max_entries} postcodes)")
+        except Exception as e:
+            self.logger.warning(f"Could not open postcode cache, continuing without it: {e}")
+        
+        if use_uprn_index:
+            try:
+                self.certificate_index = CertificateIndex(cache_path, logger=self.logger)
+                self.logger.info(f"Using UPRN index: {self.certificate_index.count()} certificates known")
+            except Exception as e:
+                self.logger.warning(f"Could not open UPRN index, continuing without it: {e}")
+        
+    def setup_backend(self, backend):
+        """Create the fetch backend: a Chrome session (selenium) or pooled HTTP connections (http)"""
+        if backend is None:
+            # Report-only use (e.g. rendering a report from a run journal)
+            self.backend = None
+            return
+        if backend == 'http':
+            os.makedirs(self.output_dir, exist_ok=True)
+            self.backend = HttpBackend(self.output_dir, service_url=self.service_url, logger=self.logger,
+                                       rate_limiter=self.rate_limiter)
+        elif backend == 'selenium':
+            self.setup_driver()
+            self.backend = SeleniumBackend(self)
+            self.browser_health = BrowserHealthMonitor(self, recycle_every=self.recycle_every,
+                                                       max_memory_mb=self.max_browser_mb, logger=self.logger)
+        else:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.logger.info(f"Using {self.backend.name} backend")
+        
     def setup_driver(self):
         """Setup Chrome driver with PDF download configuration"""
         chrome_options = Options()
@@ -80,40 +309,60 @@ class EPCCertificateScraper:
         chrome_options.add_argument("--disable-web-security")
         chrome_options.add_argument("--disable-features=VizDisplayCompositor")
         
-        # Optional: Run headless for faster processing (comment out if you want to see the browser)
-        # chrome_options.add_argument("--headless")
+        if self.browser_profile == 'performance':
+            self.apply_performance_profile(chrome_options)
         
         self.driver = webdriver.Chrome(options=chrome_options)
         self.wait = WebDriverWait(self.driver, 20)  # Increased timeout
         
-    def construct_full_address(self, row):
-        """Construct full address from address components"""
-        address_parts = [
-            str(row.get('Address Line 1', '')).strip(),
-            str(row.get('Address Line 2', '')).strip(),
-            str(row.get('Address Line 3', '')).strip(),
-            str(row.get('Address Line 4', '')).strip(),
-            str(row.get('Address Line 5', '')).strip(),
-            str(row.get('Town', '')).strip()
-        ]
-        
-        # Filter out empty parts and 'nan' strings
-        address_parts = [part for part in address_parts if part and part.lower() != 'nan']
-        return ', '.join(address_parts)
+        if self.browser_profile == 'performance':
+            # Network domain must be on for setBlockedURLs; blocking is switched per page type
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.resources_blocked = False
+    
+    def restart_browser(self):
+        """Replace the Chrome session with a fresh one (the old one may already be dead)"""
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.setup_driver()
+        self.session_established = False  # Deep link session cookies belonged to the old browser
     
-    def generate_filename(self, row):
-        """Generate filename based on the specified format"""
-        scheme_abbrev = str(row.get('Scheme Abbreviation', 'Unknown')).strip()
-        plot_number = str(row.get('Development Plot Number', 'Unknown')).strip()
-        tenure = str(row.get('Tenure', 'Unknown')).strip()
-        uprn = str(row.get('UPRN', 'Unknown')).strip()
+    def apply_performance_profile(self, chrome_options):
+        """Lean headless Chrome with a persistent profile and disk cache, so static assets survive between rows"""
+        session = self.worker_id[len(self.session_prefix):] if self.worker_id else None
+        profile_name = f"worker_{session}" if session else "main"  # Chrome locks a profile per process
+        if self.profile_slot:
+            profile_name = f"{self.profile_slot.name}_{profile_name}"
+        profile_dir = os.path.join(os.path.dirname(self.output_dir), "chrome_profile", profile_name)
+        os.makedirs(profile_dir, exist_ok=True)
         
-        filename = f"EPC - {scheme_abbrev} - {plot_number} - {tenure} - {uprn}.pdf"
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,1024")
+        chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+        chrome_options.add_argument(f"--disk-cache-dir={os.path.join(profile_dir, 'cache')}")
+        chrome_options.add_argument("--disk-cache-size=104857600")  # 100 MB
+        for flag in ("--disable-extensions", "--no-first-run", "--disable-sync", "--mute-audio",
+                     "--disable-background-networking", "--disable-default-apps",
+                     "--disable-component-update", "--metrics-recording-only"):
+            chrome_options.add_argument(flag)
         
-        # Clean filename (remove invalid characters)
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-        return filename
+        # Return from driver.get at DOMContentLoaded; each step waits for its own element anyway
+        chrome_options.page_load_strategy = 'eager'
+        self.logger.info(f"Using performance browser profile: headless, profile and disk cache in {profile_dir}")
     
+    def set_resource_blocking(self, enabled):
+        """Block images, fonts and tracking on search pages; lift the block for certificate pages"""
+        if self.browser_profile != 'performance' or enabled == self.resources_blocked:
+            return
+        try:
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs",
+                                        {"urls": BLOCKED_RESOURCE_PATTERNS if enabled else []})
+            self.resources_blocked = enabled
+        except Exception as e:
+            self.logger.warning(f"Could not {'enable' if enabled else 'disable'} resource blocking: {e}")
+        
     def debug_page_state(self, context=""):
         """Debug helper to log current page state"""
         try:
@@ -146,115 +395,146 @@ class EPCCertificateScraper:
         except Exception as e:
             self.logger.error(f"DEBUG Error in debug_page_state: {e}")
     
-    def wait_for_page_load(self, timeout=10):
-        """Wait for page to fully load"""
+    def wait_until_ready(self, condition, step, timeout=None, replaces_sleep=0.0, sleep_only=False):
+        """Wait for a step's own readiness condition, returning as soon as it holds.
+        
+        The time spent waiting is added to the row's Ready_Wait_s column.
+        ``replaces_sleep`` is the settle sleep the old flow had at this point
+        (only where this wait took the place of one) and is added to
+        Wait_Saved_s. With ``sleep_only`` the old code did nothing but sleep
+        here, so only the difference counts as saved.
+        """
+        started = time.monotonic()
+        try:
+            wait = WebDriverWait(self.driver, timeout) if timeout else self.wait
+            return wait.until(condition)
+        finally:
+            waited = time.monotonic() - started
+            saved = replaces_sleep - waited if sleep_only else replaces_sleep
+            self.row_metrics['Ready_Wait_s'] = round(self.row_metrics.get('Ready_Wait_s', 0) + waited, 2)
+            self.row_metrics['Wait_Saved_s'] = round(self.row_metrics.get('Wait_Saved_s', 0) + saved, 2)
+            self.logger.debug(f"{step} ready after {waited:.2f}s")
+    
+    def locate(self, step, strategies, long_wait=True, replaces_sleep=0.0):
+        """Find a step's element with whichever strategy matches first; returns (strategy name, element).
+        
+        All strategies are polled together (last successful one first), for
+        selector_probe_timeout seconds and then, only if none matched, for the
+        full wait. Raises TimeoutException when nothing matches.
+        """
+        conditions = {name: (condition, locator) for name, condition, locator in strategies}
+        
+        def matcher(name):
+            condition, locator = conditions[name]
+            check = condition(locator)
+            
+            def match(driver):
+                element = check(driver)
+                return (name, element) if element else False
+            return match
+        
+        any_strategy = EC.any_of(*[matcher(name) for name in self.selectors.ordered(step, list(conditions))])
+        try:
+            name, element = self.wait_until_ready(any_strategy, step, timeout=self.selector_probe_timeout,
+                                                  replaces_sleep=replaces_sleep)
+        except TimeoutException:
+            if not long_wait:
+                raise
+            self.logger.info(f"No {step} selector matched within {self.selector_probe_timeout}s, waiting longer")
+            name, element = self.wait_until_ready(any_strategy, step)
+        
+        self.selectors.record_success(step, name)
+        return name, element
+    
+    def wait_for_page_load(self, step="page load", timeout=10):
+        """Wait for the document to finish loading (no extra settle sleep)"""
         try:
-            self.wait.until(lambda driver: driver.execute_script("return document.readyState") == "complete")
-            time.sleep(1)  # Additional small wait for dynamic content
+            self.wait_until_ready(lambda driver: driver.execute_script("return document.readyState") == "complete",
+                                  step, timeout=timeout)
             return True
         except TimeoutException:
             self.logger.warning(f"Page did not fully load within {timeout} seconds")
             return False
     
-    def navigate_to_start(self):
+    def timed(self, stage):
+        """Timing span for one stage, recorded for the run and in the current row's metrics"""
+        return self.timer.span(stage, self.row_metrics)
+    
+    def throttle_status(self):
+        """429 if the browser is showing the service's rate-limit page, so the limiter backs off"""
+        try:
+            if 'too many requests' in (self.driver.title or '').lower():
+                return 429
+        except Exception:
+            pass
+        return None
+    
+    def navigate_to_start(self, replaces_sleep=LEGACY_SETTLE_SECONDS):
         """Navigate to the EPC certificate search page"""
         try:
-            self.driver.get("https://www.gov.uk/find-energy-certificate")
+            self.set_resource_blocking(True)
+            with self.rate_limiter.request() as request:
+                self.driver.get(self.start_url)
+                request.status = self.throttle_status()
             self.logger.info("Navigated to EPC certificate page")
             
-            # Wait for page to fully load
-            self.wait_for_page_load()
-            
-            # Click "Start now" button
-            start_button = self.wait.until(
-                EC.element_to_be_clickable((By.LINK_TEXT, "Start now"))
+            # Click "Start now" button as soon as it can be clicked
+            start_button = self.wait_until_ready(
+                EC.element_to_be_clickable((By.LINK_TEXT, "Start now")), "Start now button",
+                replaces_sleep=replaces_sleep
             )
-            start_button.click()
-            self.logger.info("Clicked 'Start now' button")
-            
-            # Wait for the next page to load
-            self.wait_for_page_load()
+            with self.rate_limiter.request() as request:
+                start_button.click()
+                self.logger.info("Clicked 'Start now' button")
+                
+                # The start page is gone once its button goes stale; the next step waits for its own form
+                self.wait_until_ready(EC.staleness_of(start_button), "property type page")
+                request.status = self.throttle_status()
             return True
             
         except TimeoutException:
             self.logger.error("Failed to find 'Start now' button")
             self.debug_page_state("start_button_not_found")
             return False
+        except WebDriverException as e:
+            # e.g. invalid session id: the browser is gone, the caller's health check restarts it
+            self.logger.error(f"Failed to open the start page: {e}")
+            return False
     
     def select_domestic_property(self):
         """Select domestic property option"""
         try:
-            # Wait for the page to fully load first
-            self.wait_for_page_load()
-            
-            # The radio buttons are hidden (visible=False), so we need to click the label instead
-            domestic_element = None
+            # The radio buttons are hidden (visible=False), so the label, its text or container is clicked instead
+            strategy, domestic_element = self.locate("domestic option", DOMESTIC_OPTION_STRATEGIES,
+                                                     replaces_sleep=LEGACY_SETTLE_SECONDS)
+            if strategy == 'radio_js':
+                # Force click the hidden radio button using JavaScript
+                self.driver.execute_script("arguments[0].click();", domestic_element)
+            else:
+                domestic_element.click()
+            self.logger.info(f"Selected domestic property option ({strategy})")
             
-            # Try different approaches to select the domestic option
+            # Verify the radio button is now selected (continues the moment the selection registers)
             try:
-                # Method 1: Try clicking the label for the domestic radio button
-                domestic_label = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//label[@for='domestic']"))
-                )
-                domestic_label.click()
-                self.logger.info("Found and clicked domestic property label")
+                self.wait_until_ready(EC.element_located_to_be_selected((By.ID, "domestic")),
+                                      "domestic selection", timeout=2, replaces_sleep=LEGACY_SETTLE_SECONDS,
+                                      sleep_only=True)
+                self.logger.info("Domestic property option is now selected")
             except TimeoutException:
-                try:
-                    # Method 2: Try finding a clickable element containing "domestic" text
-                    domestic_element = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, "//label[contains(text(), 'Domestic') or contains(text(), 'domestic')]"))
-                    )
-                    domestic_element.click()
-                    self.logger.info("Found and clicked domestic property text element")
-                except TimeoutException:
-                    try:
-                        # Method 3: Force click the hidden radio button using JavaScript
-                        domestic_radio = self.driver.find_element(By.ID, "domestic")
-                        self.driver.execute_script("arguments[0].click();", domestic_radio)
-                        self.logger.info("Force-clicked domestic radio button with JavaScript")
-                    except Exception:
-                        # Method 4: Try the parent div or container
-                        domestic_container = self.wait.until(
-                            EC.element_to_be_clickable((By.XPATH, "//div[.//input[@id='domestic']]"))
-                        )
-                        domestic_container.click()
-                        self.logger.info("Clicked domestic property container")
-            
-            # Add a small wait to ensure the selection is registered
-            time.sleep(1)
-            
-            # Verify the radio button is now selected
-            try:
-                domestic_radio = self.driver.find_element(By.ID, "domestic")
-                if domestic_radio.is_selected():
-                    self.logger.info("Domestic property option is now selected")
-                else:
-                    self.logger.warning("Domestic property option may not be selected")
+                self.logger.warning("Domestic property option may not be selected")
             except Exception as e:
                 self.logger.warning(f"Could not verify radio button selection: {e}")
             
-            # Click continue button - try different text variations
-            continue_button = None
-            try:
-                continue_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Continue')]"))
-                )
-            except TimeoutException:
-                try:
-                    continue_button = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Next')]"))
-                    )
-                except TimeoutException:
-                    # Try generic button selector
-                    continue_button = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[@type='submit']"))
-                    )
-            
-            continue_button.click()
-            self.logger.info("Clicked continue button")
+            # Click continue button - whichever text variation the page uses
+            _, continue_button = self.locate("continue button", CONTINUE_BUTTON_STRATEGIES)
             
-            # Wait for next page to load
-            self.wait_for_page_load()
+            with self.rate_limiter.request() as request:
+                continue_button.click()
+                self.logger.info("Clicked continue button")
+                
+                # Wait until the property type page has been replaced
+                self.wait_until_ready(EC.staleness_of(continue_button), "postcode page")
+                request.status = self.throttle_status()
             return True
             
         except Exception as e:
@@ -266,44 +546,26 @@ class EPCCertificateScraper:
     def enter_postcode(self, postcode):
         """Enter postcode and search"""
         try:
-            # Wait for page to load first
-            self.wait_for_page_load()
-            
-            # Wait for postcode input field
-            postcode_input = self.wait.until(
-                EC.presence_of_element_located((By.ID, "postcode"))
+            # The postcode input being present is the page's readiness signal
+            postcode_input = self.wait_until_ready(
+                EC.presence_of_element_located((By.ID, "postcode")), "postcode input",
+                replaces_sleep=LEGACY_SETTLE_SECONDS
             )
             postcode_input.clear()
             postcode_input.send_keys(postcode.strip())
             self.logger.info(f"Entered postcode: {postcode}")
             
             # Click find button - try multiple button text variations
-            find_button = None
-            try:
-                # Try "Find" button first (the actual text)
-                find_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Find')]"))
-                )
-                self.logger.info("Found 'Find' button")
-            except TimeoutException:
-                try:
-                    # Fallback to "Find address" 
-                    find_button = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[contains(text(), 'Find address')]"))
-                    )
-                    self.logger.info("Found 'Find address' button")
-                except TimeoutException:
-                    # Try by class name
-                    find_button = self.wait.until(
-                        EC.element_to_be_clickable((By.XPATH, "//button[@class='govuk-button']"))
-                    )
-                    self.logger.info("Found button by class")
-            
-            find_button.click()
-            self.logger.info("Clicked find button")
+            strategy, find_button = self.locate("find button", FIND_BUTTON_STRATEGIES)
+            self.logger.info(f"Found find button ({strategy})")
             
-            # Wait for the next page/results to load
-            self.wait_for_page_load()
+            with self.rate_limiter.request() as request:
+                find_button.click()
+                self.logger.info("Clicked find button")
+                
+                # Wait until the search form has been replaced by the results page
+                self.wait_until_ready(EC.staleness_of(find_button), "results page")
+                request.status = self.throttle_status()
             return True
             
         except TimeoutException:
@@ -311,279 +573,404 @@ class EPCCertificateScraper:
             self.debug_page_state("postcode_entry_failed")
             return False
     
-    def select_address(self, target_address, postcode):
-        """Select the correct address from the list of address links"""
+    def collect_address_candidates(self, postcode):
+        """Collect the address links from the postcode results page as candidate dicts"""
         try:
-            # Wait for page to load after clicking Find
-            self.wait_for_page_load()
-            
             # Wait for address links to appear on the page
             self.logger.info("Waiting for address links to appear...")
             
-            # Look for address links - these are clickable links in a list format
-            try:
-                # Wait for at least one address link to be present
-                self.wait.until(
-                    EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'certificate')]"))
-                )
-                self.logger.info("Found address links on page")
-                
-                # Get all address links
-                address_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, 'certificate')]")
-                
-                if not address_links:
-                    # Try alternative selectors for address links
-                    address_links = self.driver.find_elements(By.XPATH, "//a[contains(text(), 'Mallard House') or contains(text(), 'Iris Avenue')]")
-                
-                if not address_links:
-                    # Try even broader search for links containing address components
-                    address_links = self.driver.find_elements(By.XPATH, f"//a[contains(text(), '{postcode}')]")
-                
-                self.logger.info(f"Found {len(address_links)} address links")
-                
-                # Log all available addresses for debugging
-                self.logger.info("Available addresses:")
-                for i, link in enumerate(address_links[:10]):  # Show first 10
-                    try:
-                        link_text = link.text.strip()
-                        self.logger.info(f"  {i+1}. {link_text}")
-                    except Exception as e:
-                        self.logger.warning(f"  {i+1}. Error reading link text: {e}")
-                
-                # Try to find the best matching address
-                best_match = None
-                best_score = 0
-                exact_matches = []
-                
-                for link in address_links:
-                    try:
-                        link_text = link.text.strip()
-                        
-                        # Skip empty or irrelevant links
-                        if not link_text or "get a new energy certificate" in link_text.lower():
-                            continue
-                        
-                        # Calculate enhanced match score
-                        score = self.calculate_enhanced_address_match_score(target_address, link_text)
-                        
-                        # Check for high confidence matches
-                        if score >= 0.8:
-                            exact_matches.append((link, link_text, score))
-                        
-                        if score > best_score:
-                            best_score = score
-                            best_match = (link, link_text, score)
-                            
-                    except Exception as e:
-                        self.logger.warning(f"Error processing address link: {e}")
-                        continue
-                
-                # Prefer high-confidence matches
-                selected_match = None
-                if exact_matches:
-                    # Sort by score and take the highest
-                    exact_matches.sort(key=lambda x: x[2], reverse=True)
-                    selected_match = exact_matches[0]
-                    self.logger.info(f"Found high-confidence match: {selected_match[1]} (score: {selected_match[2]:.3f})")
-                elif best_match and best_score > 0.3:
-                    selected_match = best_match
-                    self.logger.info(f"Found best match: {selected_match[1]} (score: {selected_match[2]:.3f})")
-                else:
-                    self.logger.warning(f"No good match found. Best score: {best_score:.3f}")
-                
-                # Click the selected match
-                if selected_match:
-                    try:
-                        selected_match[0].click()
-                        self.logger.info("Successfully clicked matching address link")
-                        # Return success, matched address, and match score for auditing
-                        return True, selected_match[1], selected_match[2]
-                    except Exception as e:
-                        self.logger.error(f"Failed to click selected match: {e}")
-                
-                # Fallback to first address if no good matches
-                if address_links:
-                    try:
-                        first_address = address_links[0].text.strip()
-                        self.logger.warning(f"No good matches found. Trying first address: {first_address}")
-                        address_links[0].click()
-                        self.logger.info("Clicked first available address as fallback")
-                        return True, first_address, 0.0  # Return success, fallback address, and 0 score
-                    except Exception as e:
-                        self.logger.error(f"Failed to click first address: {e}")
-                
-                self.logger.error("No suitable address found to click")
-                return False, None, 0.0
-                
-            except TimeoutException:
-                self.logger.error("No address links found on page")
-                self.debug_page_state("no_address_links")
+            # Wait for at least one address link to be present
+            self.wait_until_ready(
+                EC.presence_of_element_located((By.XPATH, "//a[contains(@href, 'certificate')]")), "address links",
+                replaces_sleep=LEGACY_SETTLE_SECONDS
+            )
+            self.logger.info("Found address links on page")
+            
+            # Get all address links
+            address_links = self.driver.find_elements(By.XPATH, "//a[contains(@href, 'certificate')]")
+            
+            if not address_links:
+                # Try alternative selectors for address links
+                address_links = self.driver.find_elements(By.XPATH, "//a[contains(text(), 'Mallard House') or contains(text(), 'Iris Avenue')]")
+            
+            if not address_links:
+                # Try even broader search for links containing address components
+                address_links = self.driver.find_elements(By.XPATH, f"//a[contains(text(), '{postcode}')]")
+            
+            self.logger.info(f"Found {len(address_links)} address links")
+            
+            # Read text and href up front so the list stays usable after navigating away
+            candidates = []
+            for link in address_links:
+                try:
+                    candidates.append({
+                        'text': link.text.strip(),
+                        'href': link.get_attribute('href')
+                    })
+                except Exception as e:
+                    self.logger.warning(f"Error reading address link: {e}")
+            
+            # Log all available addresses for debugging
+            self.logger.info("Available addresses:")
+            for i, candidate in enumerate(candidates[:10]):  # Show first 10
+                self.logger.info(f"  {i+1}. {candidate['text']}")
+            
+            return candidates
+            
+        except TimeoutException:
+            self.logger.error("No address links found on page")
+            self.debug_page_state("no_address_links")
+            return None
+        except Exception as e:
+            self.logger.error(f"Error collecting address links: {e}")
+            self.debug_page_state("address_collection_error")
+            return None
+    
+    def choose_address_candidate(self, target_address, candidates, selection=None):
+        """Pick the best matching candidate, returning (candidate, score) or (None, 0.0)
+        
+        ``selection`` is a (candidate, score, kind) result already computed by a batch
+        match over the whole postcode; without it the target is scored here.
+        """
+        if selection is None:
+            selection = self.matcher.best_match(target_address, candidates)
+        candidate, score, kind = selection
+        
+        # Prefer high-confidence matches
+        if kind == 'high':
+            self.logger.info(f"Found high-confidence match: {candidate['text']} (score: {score:.3f})")
+            return candidate, score
+        elif kind == 'best':
+            self.logger.info(f"Found best match: {candidate['text']} (score: {score:.3f})")
+            return candidate, score
+        
+        self.logger.warning("No good match found")
+        
+        # Fallback to first address if no good matches
+        if candidate:
+            self.logger.warning(f"No good matches found. Trying first address: {candidate['text']}")
+            return candidate, 0.0
+        
+        return None, 0.0
+    
+    def open_address_candidate(self, candidate):
+        """Open the certificate page for a candidate collected from the results list"""
+        try:
+            # Certificate pages are rendered to PDF, so they load every resource (data-only runs just read the HTML)
+            self.set_resource_blocking(self.data_only)
+            with self.rate_limiter.request() as request:
+                self.driver.get(candidate['href'])
+                request.status = self.throttle_status()
+            self.logger.info(f"Opened certificate page: {candidate['href']}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to open certificate page for '{candidate['text']}': {e}")
+            return False
+    
+    def select_address(self, target_address, postcode, candidates=None, selection=None):
+        """Select the correct address from the list of address links"""
+        try:
+            if candidates is None:
+                with self.timed('collect_links'):
+                    candidates = self.collect_address_candidates(postcode)
+            if not candidates:
                 return False, None, 0.0
             
+            with self.timed('match'):
+                selected, score = self.choose_address_candidate(target_address, candidates, selection)
+            
+            if selected:
+                self.row_metrics['Certificate_URL'] = selected.get('href')
+                self.shared_from = self.claim_certificate(selected)
+                if self.shared_from:
+                    # An earlier row already saved this certificate: no need to open it again
+                    self.logger.info(f"Certificate already downloaded for row {self.shared_from[1] + 1}, reusing it")
+                    return True, selected['text'], score
+                with self.timed('open_certificate'):
+                    opened = self.backend.open_certificate(selected)
+            if selected and opened:
+                self.logger.info("Successfully opened matching address link")
+                # Return success, matched address, and match score for auditing
+                return True, selected['text'], score
+            
+            self.logger.error("No suitable address found to click")
+            return False, None, 0.0
+            
         except Exception as e:
             self.logger.error(f"Error in address selection: {e}")
             self.debug_page_state("address_selection_error")
             return False, None, 0.0
     
-    def normalize_address_for_matching(self, address):
-        """Normalize address text for better matching"""
-        if not address:
-            return ""
+    def claim_certificate(self, candidate):
+        """Claim the certificate for this row, or return (path, row index) of the row that already saved it"""
+        href = candidate.get('href')
+        rrn = certificate_rrn(href)
+        if rrn:
+            self.row_metrics['Certificate_RRN'] = rrn
+        if not self.shared_certificates or not href or self.row_index is None:
+            return None
+        
+        key = rrn or href
+        shared = self.shared_certificates.claim(key, self.row_index)
+        if shared is None:
+            self.claimed_certificate = key
+        return shared
+    
+    def open_indexed_certificate(self, uprn, postcode):
+        """Open the certificate an earlier run matched to this UPRN, skipping the postcode search.
+        
+        Returns (matched address, score), or None to search as usual when the UPRN
+        is not indexed or its certificate has moved or been superseded.
+        """
+        with self.timed('index_lookup'):
+            entry = self.certificate_index.get(uprn)
+        if not entry:
+            return None
+        
+        candidate = {'text': entry['matched_address'] or '', 'href': entry['href']}
+        self.row_metrics['Certificate_URL'] = entry['href']
+        self.shared_from = self.claim_certificate(candidate)
+        if self.shared_from:
+            self.row_metrics['UPRN_Index'] = 'hit'
+            return entry['matched_address'], entry['match_score'] or 0.0
+        
+        with self.timed('open_certificate'):
+            opened = self.backend.open_certificate(candidate)
+        problem = self.indexed_certificate_problem(entry, postcode) if opened else "page did not load"
+        if problem is None:
+            self.logger.info(f"UPRN {uprn} is in the index, skipped the postcode search")
+            self.row_metrics['UPRN_Index'] = 'hit'
+            return entry['matched_address'], entry['match_score'] or 0.0
+        
+        self.logger.info(f"Indexed certificate for UPRN {uprn} is out of date ({problem}), searching again")
+        self.certificate_index.invalidate(uprn)
+        if self.claimed_certificate:
+            self.shared_certificates.fail(self.claimed_certificate)
+            self.claimed_certificate = None
+        self.row_metrics.pop('Certificate_URL', None)
+        self.row_metrics.pop('Certificate_RRN', None)
+        self.row_metrics['UPRN_Index'] = 'stale'
+        return None
+    
+    def indexed_certificate_problem(self, entry, postcode):
+        """Why the opened certificate page no longer belongs to the indexed property, or None if it still does"""
+        try:
+            url, html = self.backend.current_page()
+        except Exception as e:
+            return f"could not read page: {e}"
+        
+        rrn = certificate_rrn(url)
+        if entry['rrn'] and rrn and rrn != entry['rrn']:
+            return f"now redirects to {rrn}"
+        
+        page_text = ' '.join((html or '').split()).lower()
+        for marker in SUPERSEDED_MARKERS:
+            if marker in page_text:
+                return f"page mentions '{marker}'"
+        
+        if normalize_postcode(postcode).replace(' ', '') not in re.sub(r'\s+', '', html or '').upper():
+            return f"page does not show {normalize_postcode(postcode)}"
+        return None
+    
+    def index_certificate(self, uprn, postcode, matched_address, match_score):
+        """Remember a high-confidence match so the next run can skip the search for this UPRN"""
+        href = self.row_metrics.get('Certificate_URL')
+        if not href:
+            return
+        try:
+            self.certificate_index.put(uprn, href, rrn=certificate_rrn(href), postcode=normalize_postcode(postcode),
+                                       matched_address=matched_address, match_score=round(match_score, 3))
+        except Exception as e:
+            self.logger.warning(f"Could not add UPRN {uprn} to the index: {e}")
+    
+    def open_postcode_results(self, postcode):
+        """Fast path: load the domestic results page for a postcode directly, skipping the start and property type pages"""
+        try:
+            self.set_resource_blocking(True)
+            if not self.session_established:
+                # Pick up the service's session cookies once per browser session
+                with self.rate_limiter.request() as request:
+                    self.driver.get(self.service_url)
+                    self.wait_for_page_load("service home page")
+                    request.status = self.throttle_status()
+                self.session_established = True
+                self.logger.info("Established session with the certificate service")
+            
+            query = urlencode({'postcode': postcode.strip(), 'property_type': 'domestic'})
+            with self.rate_limiter.request() as request:
+                self.driver.get(f"{self.service_url.rstrip('/')}{POSTCODE_SEARCH_PATH}?{query}")
+                self.wait_for_page_load("postcode results page")
+                request.status = self.throttle_status()
+            
+            # The results page is server-rendered, so the links are there once the page has loaded
+            if self.driver.find_elements(By.XPATH, "//a[contains(@href, 'certificate')]"):
+                self.logger.info(f"Opened results for {postcode} via deep link")
+                return True
+            
+            self.logger.warning(f"Deep link for {postcode} did not show any address links")
+            return False
+            
+        except Exception as e:
+            self.logger.warning(f"Deep link for {postcode} failed: {e}")
+            return False
+    
+    def search_postcode(self, postcode):
+        """Run the search flow for a postcode and return the candidate address list (None on failure)"""
+        start_page_sleep = LEGACY_SETTLE_SECONDS
+        if self.deep_link:
+            with self.timed('deep_link'):
+                opened = self.open_postcode_results(postcode)
+            if opened:
+                self.deep_link_failures = 0
+                with self.timed('collect_links'):
+                    candidates = self.collect_address_candidates(postcode)
+                if candidates:
+                    return candidates
+            
+            self.deep_link_failures += 1
+            self.session_established = False
+            if self.deep_link_failures >= 3:
+                # The URL scheme has probably changed - stop paying for a failed attempt on every row
+                self.logger.warning("Deep link failed 3 times in a row, using the full search flow from now on")
+                self.deep_link = False
+            self.logger.info("Falling back to the full search flow")
+            start_page_sleep = 0.0  # An extra page load after the deep link, not one the old flow slept after
         
-        # Convert to lowercase
-        normalized = address.lower()
+        with self.timed('start_page'):
+            started = self.navigate_to_start(replaces_sleep=start_page_sleep)
+        if not started:
+            self.logger.error("Failed to navigate to start")
+            return None
         
-        # Remove common prefixes and suffixes
-        normalized = re.sub(r'\b(flat|apartment|apt|unit)\s*', '', normalized)
+        with self.timed('property_type'):
+            selected = self.select_domestic_property()
+        if not selected:
+            self.logger.error("Failed to select domestic property")
+            return None
         
-        # Remove punctuation and extra spaces
-        normalized = re.sub(r'[,\.\-\(\)]', ' ', normalized)
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        with self.timed('postcode_form'):
+            entered = self.enter_postcode(postcode)
+        if not entered:
+            self.logger.error("Failed to enter postcode")
+            return None
         
-        # Remove common words that don't help with matching
-        stop_words = ['the', 'and', 'of', 'in', 'at', 'to', 'for', 'with', 'by']
-        words = normalized.split()
-        words = [word for word in words if word not in stop_words]
+        with self.timed('collect_links'):
+            return self.collect_address_candidates(postcode)
+    
+    def get_address_candidates(self, postcode, refresh=False):
+        """Return (candidates, from_cache) for a postcode, searching the live site on a cache miss"""
+        key = normalize_postcode(postcode)
+        if self.cache and not refresh:
+            with self.timed('cache_lookup'):
+                cached = self.cache.get(key)
+            if cached:
+                return cached, True
         
-        return ' '.join(words)
+        with self.timed('search'):
+            candidates = self.backend.search_postcode(postcode)
+        if candidates and self.cache:
+            self.cache.put(key, candidates)
+        return candidates, False
+    
+    def has_confident_match(self, target_address, candidates, selection=None):
+        """Check whether any candidate scores above the fallback threshold for the target address"""
+        if selection is None:
+            selection = self.matcher.best_match(target_address, candidates)
+        return selection[2] in ('high', 'best')
+    
+    def normalize_address_for_matching(self, address):
+        """Normalize address text for better matching"""
+        return epc_matching.normalize_address_for_matching(address)
 
     def extract_property_number(self, address):
         """Extract property number from address"""
-        # Look for patterns like "Flat 9", "9 HOUSE", "Unit 4", etc.
-        patterns = [
-            r'\b(?:flat|apartment|apt|unit)\s*(\d+)\b',  # "Flat 9"
-            r'\b(\d+)\s+(?:flat|apartment|apt|unit)\b',  # "9 Flat"
-            r'^(\d+)\s+\w+',  # "9 HOUSE" at start
-            r'\b(\d+)\s*[,\s]',  # Any number followed by comma or space
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, address.lower())
-            if match:
-                return match.group(1)
-        return None
+        return epc_matching.extract_property_number(address)
 
     def extract_building_name(self, address):
         """Extract building name from address"""
-        # Remove property numbers and common prefixes
-        cleaned = re.sub(r'^\d+\s*', '', address)  # Remove leading numbers
-        cleaned = re.sub(r'\b(?:flat|apartment|apt|unit)\s*\d+[,\s]*', '', cleaned, flags=re.IGNORECASE)
-        
-        # Get the first significant part (usually building name)
-        parts = [part.strip() for part in cleaned.split(',') if part.strip()]
-        if parts:
-            # Return first part, but clean it up
-            building = parts[0].strip()
-            building = re.sub(r'[,\.]', '', building)
-            return building.lower()
-        return ""
+        return epc_matching.extract_building_name(address)
 
     def calculate_enhanced_address_match_score(self, target_address, option_text):
         """Enhanced address matching with better logic"""
         try:
-            target_lower = target_address.lower()
-            option_lower = option_text.lower()
+            target = epc_matching.address_features(target_address)
+            option = epc_matching.address_features(option_text)
+            score = epc_matching.score_features(target, option)
             
-            # Extract components
-            target_number = self.extract_property_number(target_address)
-            option_number = self.extract_property_number(option_text)
+            # Debug logging (only formatted when DEBUG is enabled)
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Matching '{target_address}' vs '{option_text}':")
+                self.logger.debug(f"  Target number: {target.number}, Option number: {option.number}")
+                self.logger.debug(f"  Target building: '{target.building}', Option building: '{option.building}'")
+                self.logger.debug(f"  Final score: {score}")
             
-            target_building = self.extract_building_name(target_address)
-            option_building = self.extract_building_name(option_text)
-            
-            # Normalize both addresses
-            target_normalized = self.normalize_address_for_matching(target_address)
-            option_normalized = self.normalize_address_for_matching(option_text)
-            
-            score = 0.0
-            
-            # Property number matching (high weight)
-            if target_number and option_number:
-                if target_number == option_number:
-                    score += 0.4  # Strong match for same number
-                else:
-                    score -= 0.3  # Penalty for different numbers
-            elif target_number or option_number:
-                score -= 0.1  # Small penalty if only one has a number
-            
-            # Building name matching (high weight)
-            if target_building and option_building:
-                if target_building in option_building or option_building in target_building:
-                    score += 0.4
-                else:
-                    # Check for partial matches
-                    target_words = set(target_building.split())
-                    option_words = set(option_building.split())
-                    common_building_words = target_words.intersection(option_words)
-                    if common_building_words:
-                        score += 0.2 * len(common_building_words) / max(len(target_words), len(option_words))
-            
-            # Overall word matching (medium weight)
-            target_words = set(target_normalized.split())
-            option_words = set(option_normalized.split())
-            
-            if len(target_words) > 0:
-                common_words = target_words.intersection(option_words)
-                word_score = len(common_words) / len(target_words)
-                score += 0.2 * word_score
-            
-            # Substring matching for exact phrases (low weight)
-            if target_building and target_building in option_lower:
-                score += 0.1
-            
-            # Debug logging
-            self.logger.debug(f"Matching '{target_address}' vs '{option_text}':")
-            self.logger.debug(f"  Target number: {target_number}, Option number: {option_number}")
-            self.logger.debug(f"  Target building: '{target_building}', Option building: '{option_building}'")
-            self.logger.debug(f"  Final score: {score}")
-            
-            return max(0.0, min(1.0, score))  # Clamp between 0 and 1
+            return score
             
         except Exception as e:
             self.logger.warning(f"Error in enhanced address matching: {e}")
             return 0.0
     
-    def address_matches(self, target_address, option_text):
-        """Check if addresses match - you can enhance this logic"""
-        # Simple matching - convert to lowercase and check if key parts match
-        target_lower = target_address.lower()
-        option_lower = option_text.lower()
-        
-        # Extract key components and check for matches
-        target_words = set(target_lower.split())
-        option_words = set(option_lower.split())
-        
-        # Calculate overlap
-        common_words = target_words.intersection(option_words)
-        
-        # If more than 50% of words match, consider it a match
-        if len(target_words) > 0:
-            match_percentage = len(common_words) / len(target_words)
-            return match_percentage > 0.5
-        
-        return False
+    def save_pdf_via_devtools(self, filename):
+        """Render the current page with DevTools Page.printToPDF and write it straight to its final path"""
+        try:
+            self.wait_for_page_load("certificate page")
+            target_path = os.path.join(self.output_dir, filename)
+            
+            with self.timed('print_to_pdf'):
+                result = self.driver.execute_cdp_cmd("Page.printToPDF", {
+                    "printBackground": True,
+                    "preferCSSPageSize": True
+                })
+            pdf_bytes = base64.b64decode(result['data'])
+            
+            # Temp file + atomic rename: no download folder scan and no half-written PDFs
+            write_atomically(target_path, pdf_bytes)
+            self.logger.info(f"PDF rendered via DevTools and saved to: {filename} ({len(pdf_bytes)} bytes)")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Failed to render PDF via DevTools: {str(e)}")
+            return False
     
     def download_pdf(self, filename):
         """Print page to PDF and rename to custom filename"""
+        if self.pdf_mode == 'devtools':
+            return self.save_pdf_via_devtools(filename)
+        
+        watcher = DownloadWatcher(self.download_dir, timeout=self.download_timeout, logger=self.logger)
         try:
+            # Snapshot the download folder before printing so only the new file is picked up
+            watcher.start()
+            
             # Look for print button first
-            try:
-                print_button = self.wait.until(
-                    EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Print') or contains(@href, 'print')]"))
-                )
-                print_button.click()
-                self.logger.info("Clicked print button")
-            except TimeoutException:
-                # If no print button found, use Ctrl+P
-                self.logger.info("No print button found, using Ctrl+P")
-                self.driver.execute_script("window.print();")
+            with self.timed('print'):
+                try:
+                    # Don't sit through the long wait on a page that had no print button last time
+                    _, print_button = self.locate("print button", PRINT_LINK_STRATEGIES,
+                                                  long_wait=self.selectors.preferred("print button") != 'window_print')
+                    with self.rate_limiter.request():
+                        print_button.click()
+                    self.logger.info("Clicked print button")
+                except TimeoutException:
+                    # If no print button found, use Ctrl+P
+                    self.logger.info("No print button found, using Ctrl+P")
+                    self.driver.execute_script("window.print();")
+                    self.selectors.record_success("print button", 'window_print')
             
             # Wait for download to complete
             self.logger.info("Waiting for PDF download to complete...")
-            time.sleep(8)  # Give more time for download
+            with self.timed('download_wait'):
+                downloaded_path, waited = watcher.wait()
+            self.row_metrics['Download_Wait_s'] = round(waited, 2)
+            
+            if not downloaded_path:
+                self.logger.error(f"PDF download did not complete within {self.download_timeout} seconds")
+                return False
+            self.logger.info(f"PDF download completed in {waited:.2f} seconds")
             
-            # Find the downloaded file and rename it
-            downloaded_file = self.find_and_rename_downloaded_file(filename)
+            # Rename the downloaded file
+            with self.timed('rename'):
+                downloaded_file = self.find_and_rename_downloaded_file(filename, downloaded_path)
             
             if downloaded_file:
                 self.logger.info(f"PDF successfully downloaded and renamed to: {filename}")
@@ -595,14 +982,19 @@ class EPCCertificateScraper:
         except Exception as e:
             self.logger.error(f"Failed to download PDF: {str(e)}")
             return False
+        finally:
+            watcher.stop()
     
-    def find_and_rename_downloaded_file(self, target_filename):
-        """Find the most recently downloaded PDF and rename it to target filename"""
+    def find_and_rename_downloaded_file(self, target_filename, downloaded_path=None):
+        """Find the most recently downloaded PDF (unless already known) and rename it to target filename"""
         try:
             import glob
             import os
             from pathlib import Path
             
+            if downloaded_path:
+                return self.move_into_place(downloaded_path, target_filename)
+            
             # Common patterns for downloaded EPC files
             search_patterns = [
                 "Energy performance certificate (EPC)*.pdf",
@@ -629,17 +1021,7 @@ class EPCCertificateScraper:
                         most_recent_file = file_path
             
             if most_recent_file:
-                target_path = os.path.join(self.download_dir, target_filename)
-                
-                # If target file already exists, remove it
-                if os.path.exists(target_path):
-                    os.remove(target_path)
-                    self.logger.info(f"Removed existing file: {target_filename}")
-                
-                # Rename the downloaded file
-                os.rename(most_recent_file, target_path)
-                self.logger.info(f"Renamed '{os.path.basename(most_recent_file)}' to '{target_filename}'")
-                return target_path
+                return self.move_into_place(most_recent_file, target_filename)
             else:
                 self.logger.warning("No recently downloaded PDF file found to rename")
                 return None
@@ -648,64 +1030,32 @@ class EPCCertificateScraper:
             self.logger.error(f"Error in file renaming: {str(e)}")
             return None
     
-    def process_single_property(self, row):
-        """Process a single property"""
-        postcode = str(row.get('Post Code', '')).strip()
-        full_address = self.construct_full_address(row)
-        filename = self.generate_filename(row)
+    def move_into_place(self, downloaded_path, target_filename):
+        """Rename a downloaded PDF to its target filename in the output directory"""
+        target_path = os.path.join(self.output_dir, target_filename)
         
-        self.logger.info(f"Processing property: {full_address}, {postcode}")
+        # If target file already exists, remove it
+        if os.path.exists(target_path):
+            os.remove(target_path)
+            self.logger.info(f"Removed existing file: {target_filename}")
         
-        try:
-            # Navigate to start
-            if not self.navigate_to_start():
-                raise Exception("Failed to navigate to start")
-            
-            # Select domestic property
-            if not self.select_domestic_property():
-                raise Exception("Failed to select domestic property")
-            
-            # Enter postcode
-            if not self.enter_postcode(postcode):
-                raise Exception("Failed to enter postcode")
-            
-            # Select address
-            if not self.select_address(full_address, postcode):
-                raise Exception("Failed to select address")
-            
-            # Download PDF
-            if not self.download_pdf(filename):
-                raise Exception("Failed to download PDF")
-            
-            self.success_count += 1
-            self.results.append({
-                'Address': full_address,
-                'Postcode': postcode,
-                'Filename': filename,
-                'Status': 'Success',
-                'Error': None
-            })
-            
-            self.logger.info(f"Successfully processed: {full_address}")
-            return True
-            
-        except Exception as e:
-            self.failure_count += 1
-            error_msg = str(e)
-            self.results.append({
-                'Address': full_address,
-                'Postcode': postcode,
-                'Filename': filename,
-                'Status': 'Failed',
-                'Error': error_msg
-            })
-            
-            self.logger.error(f"Failed to process {full_address}: {error_msg}")
-            return False
+        # Rename the downloaded file
+        os.rename(downloaded_path, target_path)
+        self.logger.info(f"Renamed '{os.path.basename(downloaded_path)}' to '{target_filename}'")
+        return target_path
     
     def generate_excel_report(self, intermediate=False, interrupted=False, error=False):
-        """Generate comprehensive Excel report with results and original data."""
+        """Generate comprehensive Excel report with results and original data.
+        
+        Progress is checkpointed per row in the run journal, so the final report is
+        rendered once; later calls from cleanup or exit handlers reuse it.
+        """
+        if not intermediate and self.report_path:
+            self.logger.info(f"Excel report already generated: {self.report_path}")
+            return self.report_path
+        
         try:
+            report_started = time.perf_counter()
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
             # Add status suffix to filename
@@ -720,8 +1070,12 @@ class EPCCertificateScraper:
             report_filename = f"EPC_Processing_Report_{timestamp}{status_suffix}.xlsx"
             report_path = os.path.join(self.download_dir, report_filename)
             
+            # Streamed runs read their results back from the journal and write rows straight to disk
+            results = self.report_results()
+            
             # Create workbook with NaN handling
-            workbook = xlsxwriter.Workbook(report_path, {'nan_inf_to_errors': True})
+            workbook = xlsxwriter.Workbook(report_path, {'nan_inf_to_errors': True,
+                                                         'constant_memory': self.stream_input})
             
             # Create formats
             header_format = workbook.add_format({
@@ -745,32 +1099,27 @@ class EPCCertificateScraper:
             results_ws = workbook.add_worksheet('Processing Results')
             
             # Write results data
-            if self.results:
-                results_df = pd.DataFrame(self.results)
+            if results:
+                # One pass for the header, a second to write the rows (streamed runs re-read the journal)
+                columns = self.report_columns(results)
                 
                 # Write headers
-                for col, header in enumerate(results_df.columns):
+                for col, header in enumerate(columns):
                     results_ws.write(0, col, header, header_format)
                 
-                # Write data with conditional formatting
-                for row, record in enumerate(results_df.to_dict('records'), start=1):
-                    for col, (key, value) in enumerate(record.items()):
-                        # Handle NaN and None values
-                        if pd.isna(value) or value is None:
-                            value = ""
-                        elif isinstance(value, float) and (value != value):  # Check for NaN
-                            value = ""
-                        
-                        if key == 'Status':
-                            if value == 'Success':
-                                results_ws.write(row, col, value, success_format)
-                            else:
-                                results_ws.write(row, col, value, failure_format)
-                        else:
-                            results_ws.write(row, col, value)
+                # Write data a row at a time, then colour the status cell
+                status_col = columns.index('Status') if 'Status' in columns else None
+                for row, result in enumerate(results, start=1):
+                    values = [result.get(column) for column in columns]
+                    values = ["" if (value is None or (not isinstance(value, (list, dict)) and pd.isna(value))) else value
+                              for value in values]
+                    results_ws.write_row(row, 0, values)
+                    if status_col is not None:
+                        status = values[status_col]
+                        results_ws.write(row, status_col, status, success_format if status == 'Success' else failure_format)
                 
                 # Auto-adjust column widths
-                for col in range(len(results_df.columns)):
+                for col in range(len(columns)):
                     results_ws.set_column(col, col, 20)
             
             # Create Original Data worksheet if available
@@ -781,16 +1130,11 @@ class EPCCertificateScraper:
                 for col, header in enumerate(self.original_spreadsheet_data.columns):
                     original_ws.write(0, col, header, header_format)
                 
-                # Write original data
-                for row, record in enumerate(self.original_spreadsheet_data.to_dict('records'), start=1):
-                    for col, (key, value) in enumerate(record.items()):
-                        # Handle NaN and None values
-                        if pd.isna(value) or value is None:
-                            value = ""
-                        elif isinstance(value, float) and (value != value):  # Check for NaN
-                            value = ""
-                        
-                        original_ws.write(row, col, value)
+                # Write original data (NaN and None as blank cells)
+                original_values = self.original_spreadsheet_data.astype(object)
+                original_values = original_values.where(original_values.notna(), "")
+                for row, values in enumerate(original_values.itertuples(index=False, name=None), start=1):
+                    original_ws.write_row(row, 0, values)
                 
                 # Auto-adjust column widths
                 for col in range(len(self.original_spreadsheet_data.columns)):
@@ -819,6 +1163,27 @@ class EPCCertificateScraper:
                 ['Original File', os.path.basename(self.spreadsheet_filepath) if self.spreadsheet_filepath else 'Unknown'],
                 ['Download Directory', self.download_dir]
             ]
+            restarts = self.browser_restarts()
+            if restarts:
+                summary_data.append(['Browser Restarts', f"{len(restarts)} ({self.describe_restarts(restarts)})"])
+            if self.peak_queue_depths:
+                summary_data.append(['Peak Queue Depths', ', '.join(f"{stage}: {depth}"
+                                                                    for stage, depth in self.peak_queue_depths.items())])
+            if self.refresh:
+                summary_data.append(['Unchanged Certificates (not saved again)', self.refresh_unchanged])
+            if getattr(self, 'certificate_index', None):
+                summary_data.append(['UPRN Index Hits', self.index_hits])
+                summary_data.append(['Stale Index Entries Re-searched', self.index_stale])
+            if getattr(self, 'shared_certificates', None) and self.shared_certificates.reused:
+                summary_data.append(['Rows Sharing a Certificate', self.shared_certificates.reused])
+            if getattr(self, 'rate_limiter', None):
+                limiter_stats = self.rate_limiter.stats()
+                summary_data += [
+                    ['Page Requests', limiter_stats['requests']],
+                    ['Throttled Responses', limiter_stats['throttled']],
+                    ['Final Rate Limit (req/s)', limiter_stats['rate'] or 'Unlimited'],
+                    ['Final In-Flight Limit', limiter_stats['in_flight_limit']],
+                ]
             
             for row, (label, value) in enumerate(summary_data):
                 summary_ws.write(row, 0, label, header_format)
@@ -827,10 +1192,31 @@ class EPCCertificateScraper:
             summary_ws.set_column(0, 0, 25)
             summary_ws.set_column(1, 1, 30)
             
+            # Create Timings worksheet: where the run's time went, per stage
+            timings = self.timer.summary() if getattr(self, 'timer', None) else {}
+            if timings:
+                # Time the report up to here so it appears in its own sheet (excludes closing the workbook)
+                self.timer.record('report', time.perf_counter() - report_started)
+                timings = self.timer.summary()
+                timings_ws = workbook.add_worksheet('Timings')
+                timing_headers = ['Stage'] + list(next(iter(timings.values())).keys())
+                for col, header in enumerate(timing_headers):
+                    timings_ws.write(0, col, header, header_format)
+                for row, (stage, stats) in enumerate(timings.items(), start=1):
+                    timings_ws.write_row(row, 0, [stage] + list(stats.values()))
+                timings_ws.set_column(0, len(timing_headers) - 1, 15)
+            
             workbook.close()
             
+            if results and not intermediate:
+                self.write_certificate_data(report_path, results)
+            
+            if timings:
+                self.write_timings_json(report_path)
+            
             if not intermediate:
                 print(f"📊 Excel report generated: {report_path}")
+                self.report_path = report_path
             self.logger.info(f"Excel report generated: {report_path}")
             return report_path
             
@@ -839,138 +1225,119 @@ class EPCCertificateScraper:
             print(f"Error generating Excel report: {e}")
             return None
 
+    def browser_restarts(self):
+        """Restart reasons from this session and every worker"""
+        restarts = []
+        for session in [self] + list(getattr(self, 'worker_scrapers', [])):
+            if getattr(session, 'browser_health', None):
+                restarts += session.browser_health.restarts
+        return restarts
+    
+    def describe_restarts(self, restarts):
+        """'recycled: 2, session died: 1' - reasons grouped by kind"""
+        counts = {}
+        for reason in restarts:
+            kind = 'memory' if reason.startswith('memory') else reason.split(' after ')[0]
+            counts[kind] = counts.get(kind, 0) + 1
+        return ', '.join(f"{kind}: {count}" for kind, count in counts.items())
+    
+    def write_certificate_data(self, report_path, results):
+        """Write the parsed certificate fields of every row to a Parquet (or CSV) file next to the report"""
+        if not any(result.get('Current_Rating') or result.get('Certificate_Date') for result in results):
+            return None
+        try:
+            data_path = write_certificate_table(os.path.splitext(report_path)[0] + "_certificates", results)
+            print(f"📄 Certificate data written to: {data_path}")
+            self.logger.info(f"Certificate data written to: {data_path}")
+            return data_path
+        except Exception as e:
+            self.logger.error(f"Error writing certificate data: {e}")
+            return None
+    
+    def write_timings_json(self, report_path):
+        """Write the per-stage timing summary next to the Excel report"""
+        timings_path = os.path.splitext(report_path)[0] + "_timings.json"
+        try:
+            self.timer.write_json(timings_path,
+                                  spreadsheet=self.spreadsheet_filepath,
+                                  rows_succeeded=self.success_count,
+                                  rows_failed=self.failure_count,
+                                  rate_limiter=self.rate_limiter.stats())
+            self.logger.info(f"Stage timings written to: {timings_path}")
+        except Exception as e:
+            self.logger.error(f"Error writing stage timings: {e}")
+    
+    def metrics_gauges(self):
+        """Run counters exported alongside the stage timings on the metrics endpoint"""
+        limiter_stats = self.rate_limiter.stats()
+        gauges = {
+            'rows_succeeded': self.success_count,
+            'rows_failed': self.failure_count,
+            'page_requests': limiter_stats['requests'],
+            'throttled_requests': limiter_stats['throttled'],
+            'in_flight_limit': limiter_stats['in_flight_limit'],
+        }
+        pipeline = self.active_pipeline
+        if pipeline:
+            for stage, depth in pipeline.depths().items():
+                gauges[f'queue_depth_{stage}'] = depth
+        return gauges
+    
+    def report_results(self):
+        """Results for the report in spreadsheet order: held in memory, or read back from the journal for streamed runs"""
+        if self.stream_input and self.journal:
+            return JournalResults(self.journal)
+        # Batched runs finish rows out of order
+        return sorted(self.results, key=lambda result: result.get('Original_Index', 0))
+    
+    def report_columns(self, results):
+        """Every column that appears in any result, in order of first appearance"""
+        columns = {}
+        for result in results:
+            columns.update(dict.fromkeys(result))
+        return list(columns)
+    
+    def has_results(self):
+        """Whether any row has been processed (streamed runs only count them)"""
+        if self.queue_worker:
+            return False  # Results live in the job queue; --queue-report renders them
+        return bool(self.results) or (self.stream_input and self.success_count + self.failure_count > 0)
+    
     def process_spreadsheet(self, file_path):
         """Read and process the Excel spreadsheet containing addresses."""
         try:
             print(f"Reading addresses from: {file_path}")
             self.logger.info(f"Processing spreadsheet: {file_path}")
             
-            # Store original file path
-            self.spreadsheet_filepath = file_path
-            
-            # Read the spreadsheet
-            df = pd.read_excel(file_path)
-            
-            # Store original data for report
-            self.original_spreadsheet_data = df.copy()
-            
-            # Check for different possible column formats
-            postcode_col = None
-            address_cols = []
-            
-            # Check for postcode column variations
-            for col in df.columns:
-                if col.lower() in ['postcode', 'post code', 'postal code']:
-                    postcode_col = col
-                    break
-            
-            # Check for address columns
-            if 'Address' in df.columns:
-                # Simple format: single Address column
-                address_cols = ['Address']
-            else:
-                # Complex format: multiple address line columns
-                for i in range(1, 6):  # Address Line 1-5
-                    col_name = f'Address Line {i}'
-                    if col_name in df.columns:
-                        address_cols.append(col_name)
-            
-            if not postcode_col:
-                print("Error: Spreadsheet must contain a postcode column ('Postcode', 'Post Code', etc.)")
-                self.logger.error("No postcode column found in spreadsheet")
-                return False
-                
-            if not address_cols:
-                print("Error: Spreadsheet must contain address information ('Address' or 'Address Line X' columns)")
-                self.logger.error("No address columns found in spreadsheet")
+            spreadsheet = self.open_spreadsheet(file_path)
+            if not spreadsheet:
                 return False
-            
-            total_addresses = len(df)
-            print(f"Found {total_addresses} addresses to process")
-            self.logger.info(f"Found {total_addresses} addresses to process")
-            print(f"Using postcode column: '{postcode_col}'")
-            print(f"Using address columns: {address_cols}")
-            
-            # Process each address
-            for index, row in df.iterrows():
-                # Construct full address from multiple columns
-                address_parts = []
-                for col in address_cols:
-                    value = str(row[col]).strip()
-                    if value and value.lower() != 'nan':
-                        address_parts.append(value)
-                
-                # Add town if available and not already included
-                if 'Town' in df.columns:
-                    town = str(row['Town']).strip()
-                    if town and town.lower() != 'nan':
-                        address_parts.append(town)
-                
-                full_address = ', '.join(address_parts)
-                postcode = str(row[postcode_col]).strip()
-                
-                print(f"\nProcessing address {index + 1}/{total_addresses}")
-                print(f"Address: {full_address}")
-                print(f"Postcode: {postcode}")
-                
-                result_tuple = self.download_epc_certificate(full_address, postcode, row)
-                
-                # Handle the returned tuple (success, matched_address, match_score)
-                if isinstance(result_tuple, tuple) and len(result_tuple) >= 3:
-                    result, matched_address, match_score = result_tuple
-                elif isinstance(result_tuple, tuple) and len(result_tuple) == 2:
-                    result, matched_address = result_tuple
-                    match_score = 0.0
-                else:
-                    # Fallback for backward compatibility
-                    result = result_tuple if isinstance(result_tuple, bool) else False
-                    matched_address = "Address details not captured"
-                    match_score = 0.0
-                
-                # Determine match quality based on score
-                match_quality = "Failed"
-                if result and match_score >= 0.8:
-                    match_quality = "High Confidence"
-                elif result and match_score >= 0.5:
-                    match_quality = "Medium Confidence"
-                elif result and match_score > 0.0:
-                    match_quality = "Low Confidence"
-                elif result:
-                    match_quality = "Fallback Match"
-                
-                # Store result with original row data and audit information
-                result_entry = {
-                    'Original_Index': index,
-                    'Input_Address': full_address,  # What we searched for
-                    'Input_Postcode': postcode,
-                    'Matched_Address': matched_address or "No match found",  # What was actually selected
-                    'Match_Score': round(match_score, 3) if match_score > 0 else 0.0,
-                    'Match_Quality': match_quality,
-                    'Status': 'Success' if result else 'Failed',
-                    'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # Add any additional columns from original data
-                for col in df.columns:
-                    if col not in address_cols and col != postcode_col:
-                        result_entry[f'Original_{col}'] = row[col]
-                
-                self.results.append(result_entry)
-                
-                if result:
-                    self.success_count += 1
-                    print(f"✅ Matched with: {matched_address}")
-                else:
-                    self.failure_count += 1
-                    print(f"❌ Failed to match")
-                
-                # Generate intermediate report every 10 properties or if we have failures
-                if (index + 1) % 10 == 0 or not result:
-                    self.generate_excel_report(intermediate=True)
-                
-                # Brief pause between requests
-                time.sleep(2)
-            
+            postcode_col, address_cols, total_addresses, chunks = spreadsheet
+            
+            # Open the crash-safe run journal; streamed runs keep results on disk only
+            self.journal = RunJournal(self.journal_path_for(file_path), resume=self.resume, logger=self.logger,
+                                      keep_results=not self.stream_input)
+            self.journal.write_meta(spreadsheet=os.path.abspath(file_path),
+                                    started_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                    total_rows=total_addresses)
+            print(f"Progress is checkpointed to: {self.journal.path}")
+            
+            def on_result(job, result_tuple):
+                with self.results_lock:
+                    # Checkpoint to the append-only journal; the workbook is rendered once at the end
+                    result_entry = self.record_result(job, result_tuple)
+                    self.journal_result(job, result_entry)
+            
+            rows_read = 0
+            for chunk in chunks:
+                # Build address, postcode and filename for every row in the chunk up front
+                jobs = self.prepare_jobs(chunk, postcode_col, address_cols)
+                self.process_jobs(jobs, total_addresses, on_result)
+                rows_read += len(chunk)
+            
+            if rows_read != total_addresses:
+                # The up-front count was off; record the real one so --render-report can tell the run finished
+                self.journal.write_meta(total_rows=rows_read)
             self.generate_excel_report()
             return True
             
@@ -985,85 +1352,755 @@ class EPCCertificateScraper:
             self.generate_excel_report(error=True)
             return False
     
-    def download_epc_certificate(self, address, postcode, row_data=None):
-        """Main method to download EPC certificate for a single address."""
+    def open_spreadsheet(self, file_path):
+        """Read the spreadsheet (or just its header when streaming) and find its columns.
+        
+        Returns (postcode column, address columns, row count, chunks of rows), or None if
+        the sheet has no postcode or address columns.
+        """
+        # Store original file path
+        self.spreadsheet_filepath = file_path
+        
+        # Read the spreadsheet (or just its header when streaming it in chunks)
+        stream = self.stream_input or not file_path.lower().endswith(('.xlsx', '.xls', '.xlsm'))
+        if stream:
+            columns = epc_input.read_columns(file_path)
+            total_addresses = epc_input.count_rows(file_path)
+        else:
+            df = pd.read_excel(file_path)
+            # Store original data for report
+            self.original_spreadsheet_data = df.copy()
+            columns = list(df.columns)
+            total_addresses = len(df)
+        self.stream_input = stream
+        
+        postcode_col, address_cols = self.detect_columns(columns)
+        
+        if not postcode_col:
+            print("Error: Spreadsheet must contain a postcode column ('Postcode', 'Post Code', etc.)")
+            self.logger.error("No postcode column found in spreadsheet")
+            return None
+            
+        if not address_cols:
+            print("Error: Spreadsheet must contain address information ('Address' or 'Address Line X' columns)")
+            self.logger.error("No address columns found in spreadsheet")
+            return None
+        
+        print(f"Found {total_addresses} addresses to process")
+        self.logger.info(f"Found {total_addresses} addresses to process")
+        print(f"Using postcode column: '{postcode_col}'")
+        print(f"Using address columns: {address_cols}")
+        
+        if stream:
+            # Only the columns the scraper uses, chunk_size rows at a time
+            wanted = set([postcode_col] + address_cols + STREAM_EXTRA_COLUMNS)
+            chunks = epc_input.iter_chunks(file_path, [col for col in columns if col in wanted], self.chunk_size)
+            print(f"Streaming input in chunks of {self.chunk_size} rows")
+        else:
+            chunks = [df]
+        return postcode_col, address_cols, total_addresses, chunks
+    
+    def enqueue_spreadsheet(self, file_path, job_queue):
+        """Add every row of a spreadsheet to the shared job queue; rows queued earlier are left as they are"""
+        queued_from = job_queue.meta().get('spreadsheet')
+        if queued_from and queued_from != os.path.abspath(file_path):
+            print(f"Error: {job_queue.db_path} already holds rows from {queued_from}")
+            self.logger.error(f"Job queue {job_queue.db_path} already holds rows from {queued_from}")
+            return False
+        
+        spreadsheet = self.open_spreadsheet(file_path)
+        if not spreadsheet:
+            return False
+        postcode_col, address_cols, total_addresses, chunks = spreadsheet
+        job_queue.set_meta(spreadsheet=os.path.abspath(file_path),
+                           enqueued_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+        
+        added = 0
+        for chunk in chunks:
+            jobs = self.prepare_jobs(chunk, postcode_col, address_cols)
+            added += job_queue.enqueue([(int(job.index), job.postcode_key, dict(job._asdict(), index=int(job.index)))
+                                        for job in jobs])
+        
+        print(f"📥 Queued {added} rows in {job_queue.db_path} ({total_addresses - added} were already queued)")
+        self.logger.info(f"Queued {added} of {total_addresses} rows in {job_queue.db_path}")
+        return True
+    
+    def process_queue(self, job_queue, batch_size=25):
+        """Claim batches of rows from the shared job queue and write each result back until no work is left.
+        
+        Rows leased by other workers are waited for, so a worker that dies has its
+        rows picked up again once their lease runs out.
+        """
+        self.job_queue = job_queue
+        self.resume = False  # The queue records what is done
+        self.stream_input = True  # Results are written back to the queue, not kept in memory
+        self.spreadsheet_filepath = job_queue.meta().get('spreadsheet')
+        total_addresses = sum(job_queue.counts().values())
+        
+        def on_result(job, result_tuple):
+            with self.results_lock:
+                result_entry = self.record_result(job, result_tuple)
+            job_queue.complete(job.index, self.queue_owner, result_entry)
+        
+        print(f"Worker {self.queue_owner} taking rows from {job_queue.db_path}")
+        self.logger.info(f"Queue worker {self.queue_owner} started on {job_queue.db_path}")
+        try:
+            while True:
+                claimed = job_queue.claim(self.queue_owner, batch_size)
+                if not claimed:
+                    counts = job_queue.counts()
+                    if not counts['leased']:
+                        break
+                    # Another worker still holds rows: wait, and take them over if its lease runs out
+                    expires = job_queue.next_lease_expiry() or time.time()
+                    wait = min(max(expires - time.time(), 1.0), 30.0)
+                    print(f"⏳ {counts['leased']} rows held by other workers, checking again in {wait:.0f}s")
+                    time.sleep(wait)
+                    continue
+                
+                jobs = [PropertyJob(**payload) for _, payload in claimed]
+                print(f"📥 Claimed {len(jobs)} rows")
+                self.logger.info(f"Claimed {len(jobs)} rows from the job queue")
+                self.process_jobs(jobs, total_addresses, on_result)
+            
+            counts = job_queue.counts()
+            print(f"Queue finished: {counts['done']} rows done, {counts['failed']} given up after "
+                  f"{job_queue.max_attempts} attempts")
+            return True
+        
+        except KeyboardInterrupt:
+            print("\n⚠️  Worker interrupted by user")
+            self.logger.info("Queue worker interrupted by user")
+            return False
+        finally:
+            job_queue.release(self.queue_owner)
+    
+    def load_results_from_queue(self, job_queue):
+        """Rebuild results and counters from the job queue, for the combined report of every worker"""
+        self.results = []
+        for position, payload, status, attempts, result in job_queue.rows():
+            if result:
+                self.results.append(result)
+            elif status == 'failed':
+                # Every worker that leased this row stopped before finishing it
+                self.results.append({
+                    'Original_Index': position,
+                    'Input_Address': payload['full_address'],
+                    'Input_Postcode': payload['postcode'],
+                    'Matched_Address': "No match found",
+                    'Match_Score': 0.0,
+                    'Match_Quality': "Failed",
+                    'Status': 'Failed',
+                    'Error': f"Abandoned after {attempts} attempts",
+                })
+        self.success_count = sum(1 for r in self.results if r.get('Status') == 'Success')
+        self.failure_count = len(self.results) - self.success_count
+        
+        self.spreadsheet_filepath = job_queue.meta().get('spreadsheet')
+        if (self.spreadsheet_filepath and os.path.exists(self.spreadsheet_filepath)
+                and self.spreadsheet_filepath.lower().endswith(('.xlsx', '.xls', '.xlsm'))):
+            self.original_spreadsheet_data = pd.read_excel(self.spreadsheet_filepath)
+        return len(self.results)
+    
+    def detect_columns(self, columns):
+        """Find the postcode column and the address column(s) in a spreadsheet header"""
+        postcode_col = None
+        address_cols = []
+        
+        # Check for postcode column variations
+        for col in columns:
+            if str(col).lower() in ['postcode', 'post code', 'postal code']:
+                postcode_col = col
+                break
+        
+        # Check for address columns
+        if 'Address' in columns:
+            # Simple format: single Address column
+            address_cols = ['Address']
+        else:
+            # Complex format: multiple address line columns
+            for i in range(1, 6):  # Address Line 1-5
+                col_name = f'Address Line {i}'
+                if col_name in columns:
+                    address_cols.append(col_name)
+        
+        return postcode_col, address_cols
+    
+    def process_jobs(self, jobs, total_addresses, on_result):
+        """Skip completed rows, group the rest and run them on this session or the worker pool"""
+        if self.resume:
+            jobs = self.skip_completed_jobs(jobs)
+        
+        if self.batch_by_postcode:
+            groups = self.group_jobs_by_postcode(jobs)
+            print(f"Batching {len(jobs)} addresses into {len(groups)} postcode searches")
+            self.logger.info(f"Batching {len(jobs)} addresses into {len(groups)} postcode searches")
+        else:
+            groups = [(None, [job]) for job in jobs]
+        
+        # Process each address
+        if self.pipeline and groups:
+            self.process_groups_in_pipeline(groups, total_addresses, on_result)
+        elif (self.workers > 1 or self.queue_worker) and groups:
+            self.process_groups_in_parallel(groups, total_addresses, on_result)
+        else:
+            for group_postcode, group_jobs in groups:
+                self.process_group(group_postcode, group_jobs, total_addresses, on_result)
+    
+    def load_results_from_journal(self, journal_path):
+        """Rebuild results and counters from a run journal, for rendering a report on demand.
+        
+        Returns (rows loaded, rows in the input spreadsheet or None if unknown).
+        """
+        journal = RunJournal(journal_path, logger=self.logger, readonly=True)
+        self.results = journal.results()
+        self.success_count = sum(1 for r in self.results if r.get('Status') == 'Success')
+        self.failure_count = len(self.results) - self.success_count
+        
+        self.spreadsheet_filepath = journal.meta.get('spreadsheet')
+        if (self.spreadsheet_filepath and os.path.exists(self.spreadsheet_filepath)
+                and self.spreadsheet_filepath.lower().endswith(('.xlsx', '.xls', '.xlsm'))):
+            self.original_spreadsheet_data = pd.read_excel(self.spreadsheet_filepath)
+        
+        total_rows = journal.meta.get('total_rows')
+        if total_rows is None and self.spreadsheet_filepath and os.path.exists(self.spreadsheet_filepath):
+            # Journals written before the row count was recorded: count the spreadsheet itself
+            try:
+                total_rows = epc_input.count_rows(self.spreadsheet_filepath)
+            except Exception as e:
+                self.logger.warning(f"Could not count rows in {self.spreadsheet_filepath}: {e}")
+        return len(self.results), total_rows
+    
+    def journal_path_for(self, file_path):
+        """Journal file for a spreadsheet, kept next to the logs directory"""
+        journal_dir = os.path.join(os.path.dirname(self.download_dir), "journals")
+        return os.path.join(journal_dir, f"{Path(file_path).stem}.journal.jsonl")
+    
+    def journal_key(self, job):
+        """Key rows by spreadsheet row and UPRN: one UPRN can appear on several rows (e.g. one per tenure)"""
+        return f"row:{job.index}:{job.uprn}"
+    
+    def row_output_file(self, job, entry):
+        """The certificate path this row saves to, with the extension the backend that saved it used"""
+        recorded = entry.get('output_file')
+        extension = os.path.splitext(recorded)[1] if recorded else os.path.splitext(job.filename)[1]
+        return os.path.join(self.output_dir, os.path.splitext(job.filename)[0] + extension)
+    
+    def journal_result(self, job, result_entry):
+        """Append a processed row to the run journal (fsynced before returning)"""
+        if not self.journal:
+            return
+        try:
+            self.journal.append(self.journal_key(job),
+                                uprn=job.uprn,
+                                status=result_entry['Status'],
+                                matched_address=result_entry.get('Matched_Address'),
+                                certificate_href=result_entry.get('Certificate_URL'),
+                                output_file=result_entry.get('Output_File'),
+                                result=result_entry,
+                                row=int(job.index))
+        except Exception as e:
+            self.logger.error(f"Failed to write run journal entry: {e}")
+    
+    def skip_completed_jobs(self, jobs):
+        """Drop jobs the journal records as done with their output file still on disk, reusing their results"""
+        remaining = []
+        skipped = 0
+        for job in jobs:
+            key = self.journal_key(job)
+            entry = self.journal.completed_entry(key, require_file=not self.data_only, row=int(job.index))
+            if entry and entry.get('output_file') and not os.path.exists(self.row_output_file(job, entry)):
+                # The row's own file, not whichever path the entry happens to record
+                entry = None
+            if entry:
+                result_entry = dict(entry.get('result') or {})
+                result_entry['Original_Index'] = job.index
+                if not self.stream_input:
+                    self.results.append(result_entry)
+                self.success_count += 1
+                skipped += 1
+            else:
+                remaining.append(job)
+        
+        print(f"Resuming: {skipped} rows already completed, {len(remaining)} left to process")
+        self.logger.info(f"Resuming: {skipped} rows already completed, {len(remaining)} left to process")
+        return remaining
+    
+    def process_group(self, group_postcode, group_jobs, total_addresses, on_result):
+        """Process one postcode group (or a single row when not batching), reporting each row via on_result"""
+        candidates = None
+        from_cache = False
+        if group_postcode is not None:
+            try:
+                candidates, from_cache = self.lookup_group(group_postcode, group_jobs)
+            except Exception as e:
+                error = getattr(e, 'msg', None) or str(e)  # Selenium errors without their 'Message:' prefix
+                self.logger.error(f"Batch search failed for {group_postcode}: {error}")
+                for job in group_jobs:
+                    on_result(job, self.failed_row(job, f"Postcode search failed: {error}"))
+                return
+        
+        selections = self.match_group(group_jobs, candidates)
+        for job, selection in zip(group_jobs, selections):
+            on_result(job, self.process_row(job, total_addresses, candidates, from_cache, selection))
+    
+    def lookup_group(self, group_postcode, group_jobs):
+        """Search a postcode once for a group of rows: (candidates, from_cache), or (None, False) to leave it to each row"""
+        if self.all_indexed(group_jobs):
+            # Every row has a certificate from an earlier run; rows that fail validation search on their own
+            self.logger.info(f"All {len(group_jobs)} rows in {group_postcode} are in the UPRN index, skipping the search")
+            return None, False
+        
+        # Recycle a long-lived, bloated or hung browser before the shared search, as before each row
+        if self.browser_health:
+            self.browser_health.check()
+        
+        # One search serves every row in this postcode
+        postcode = group_jobs[0].postcode
+        try:
+            candidates, from_cache = self.get_address_candidates(postcode)
+        except Exception as e:
+            if not self.browser_health:
+                raise
+            self.logger.error(f"Batch search for {group_postcode} raised: {e}")
+            candidates, from_cache = None, False
+        if candidates is None and self.browser_health and not self.browser_health.is_responsive():
+            # The session died during the search: start a new browser and search once more
+            self.browser_health.restart("session died")
+            candidates, from_cache = self.get_address_candidates(postcode)
+            if candidates is None and not self.browser_health.is_responsive():
+                raise Exception("browser session died again after a restart")
+        if candidates is None:
+            self.logger.warning(f"Batch search failed for {group_postcode}, falling back to per-row search")
+        return candidates, from_cache
+    
+    def match_group(self, group_jobs, candidates):
+        """Score every row in the group against the shared candidate list in one pass"""
+        if not candidates:
+            return [None] * len(group_jobs)
+        return self.matcher.best_matches([job.full_address for job in group_jobs], candidates)
+    
+    def failed_row(self, job, error):
+        """Result tuple for a row that could not be attempted, with the reason in its Error column"""
+        print(f"\nSkipping address {job.index + 1}{self.worker_label}: {error}")
+        self.logger.error(f"Row {job.index + 1} ({job.full_address}, {job.postcode}) failed: {error}")
+        return False, None, 0.0, {'Error': error}
+    
+    def process_row(self, job, total_addresses, candidates=None, from_cache=False, selection=None):
+        """Open, save and time one row's certificate on this session, restarting a dead browser once"""
+        print(f"\nProcessing address {job.index + 1}/{total_addresses}{self.worker_label}")
+        print(f"Address: {job.full_address}")
+        print(f"Postcode: {job.postcode}")
+        
+        # Recycle a long-lived, bloated or hung browser before it fails the row
+        restart_reason = self.browser_health.check() if self.browser_health else None
+        
+        started = time.perf_counter()
+        result_tuple = self.download_epc_certificate(job.full_address, job.postcode,
+                                                     candidates=candidates, from_cache=from_cache,
+                                                     filename=job.filename, selection=selection,
+                                                     row_index=job.index, uprn=job.uprn)
+        if not result_tuple[0] and self.browser_health and not self.browser_health.is_responsive():
+            # The session died mid-row: start a new browser and give the row another go
+            restart_reason = "session died"
+            self.browser_health.restart(restart_reason)
+            result_tuple = self.download_epc_certificate(job.full_address, job.postcode,
+                                                         candidates=candidates, from_cache=from_cache,
+                                                         filename=job.filename, selection=selection,
+                                                         row_index=job.index, uprn=job.uprn)
+        self.timer.record('row', time.perf_counter() - started, result_tuple[3])
+        if self.browser_health:
+            self.browser_health.row_done()
+        if restart_reason:
+            result_tuple[3]['Browser_Restart'] = restart_reason
+        return result_tuple
+    
+    def process_groups_in_pipeline(self, groups, total_addresses, on_result):
+        """Run lookup -> match -> certificate -> record as stages joined by bounded queues.
+        
+        Lookup sessions search postcodes while the certificate sessions open and save
+        certificates, so a slow PDF render no longer holds up the next search.
+        """
+        def lookup(group, session):
+            group_postcode, group_jobs = group
+            # lookup_group health-checks the session first and restarts it if it dies mid-search
+            candidates, from_cache = session.lookup_group(group_postcode or group_jobs[0].postcode_key, group_jobs)
+            if session.browser_health:
+                session.browser_health.row_done()  # Lookup sessions are recycled every N searches
+            return [(group_jobs, candidates, from_cache)]
+        
+        def match(looked_up, _):
+            group_jobs, candidates, from_cache = looked_up
+            with self.timer.span('match_group'):
+                selections = self.match_group(group_jobs, candidates)
+            return [(job, candidates, from_cache, selection) for job, selection in zip(group_jobs, selections)]
+        
+        def certificate(row, session):
+            job, candidates, from_cache, selection = row
+            return [(job, session.process_row(job, total_addresses, candidates, from_cache, selection))]
+        
+        def record(processed, _):
+            on_result(*processed)
+        
+        # A stage that raises sends failed results for the item's rows straight to record
+        def lookup_failed(group, error, session):
+            return [(job, session.failed_row(job, f"Postcode search failed: {getattr(error, 'msg', None) or error}"))
+                    for job in group[1]]
+        
+        def match_failed(looked_up, error, _):
+            return [(job, self.failed_row(job, f"Address matching failed: {error}")) for job in looked_up[0]]
+        
+        def certificate_failed(row, error, session):
+            return [(row[0], session.failed_row(row[0], f"Certificate failed: {getattr(error, 'msg', None) or error}"))]
+        
+        pipeline = Pipeline(queue_size=self.queue_size, logger=self.logger)
+        pipeline.add_stage('lookup', lookup, self.ensure_lookup_sessions(), on_error=lookup_failed)
+        pipeline.add_stage('match', match, [None] * max(1, self.match_workers), on_error=match_failed)
+        pipeline.add_stage('certificate', certificate, self.ensure_workers(), on_error=certificate_failed)
+        pipeline.add_stage('record', record, [None])  # One writer keeps the journal and counters in order
+        self.logger.info(f"Pipeline stages: {pipeline.describe()} (queues hold up to {self.queue_size} items)")
+        
+        self.active_pipeline = pipeline.start()
+        try:
+            for group in groups:
+                pipeline.feed(group)
+            pipeline.finish()
+        finally:
+            for stage, depth in pipeline.peak_depths().items():
+                self.peak_queue_depths[stage] = max(depth, self.peak_queue_depths.get(stage, 0))
+            self.active_pipeline = None
+    
+    def page_sessions(self):
+        """Sessions that load pages concurrently: the certificate workers, plus the lookup sessions in --pipeline mode"""
+        return self.workers + (max(1, self.lookup_workers) if self.pipeline else 0)
+    
+    def ensure_lookup_sessions(self):
+        """Start the sessions the pipeline's lookup stage searches postcodes with"""
+        if not self.lookup_scrapers:
+            self.lookup_scrapers = [self.create_worker(f"{self.session_prefix}lookup_{number}")
+                                    for number in range(1, max(1, self.lookup_workers) + 1)]
+        return self.lookup_scrapers
+    
+    def all_indexed(self, jobs):
+        """True when every job's UPRN has a certificate in the UPRN index"""
+        if not self.certificate_index:
+            return False
+        return all(job.uprn and self.certificate_index.get(job.uprn) for job in jobs)
+    
+    def create_worker(self, worker_id):
+        """Create an isolated worker session with its own browser and download directory"""
+        worker_dir = os.path.join(self.download_dir, f"_worker_{worker_id}")
+        worker = EPCCertificateScraper(download_dir=worker_dir,
+                                       batch_by_postcode=self.batch_by_postcode,
+                                       backend=self.backend_name,
+                                       start_url=self.start_url,
+                                       service_url=self.service_url,
+                                       download_timeout=self.download_timeout,
+                                       pdf_mode=self.pdf_mode,
+                                       deep_link=self.deep_link,
+                                       browser_profile=self.browser_profile,
+                                       recycle_every=self.recycle_every,
+                                       max_browser_mb=self.max_browser_mb,
+                                       selector_probe_timeout=self.selector_probe_timeout,
+                                       dedupe_certificates=self.dedupe_certificates,
+                                       refresh=self.refresh,
+                                       data_only=self.data_only,
+                                       worker_id=worker_id,
+                                       parent=self)
+        return worker
+    
+    def ensure_workers(self):
+        """Start the worker sessions on first use and reuse them for every later chunk"""
+        if not self.worker_scrapers:
+            print(f"Starting {self.workers} workers")
+            self.logger.info(f"Starting {self.workers} workers")
+            self.worker_scrapers = [self.create_worker(f"{self.session_prefix}{number}")
+                                    for number in range(1, self.workers + 1)]
+        return self.worker_scrapers
+    
+    def process_groups_in_parallel(self, groups, total_addresses, on_result):
+        """Spread postcode groups over N isolated worker sessions"""
+        idle_workers = queue.Queue()
+        for worker in self.ensure_workers():
+            idle_workers.put(worker)
+        
+        def run_group(group_postcode, group_jobs):
+            worker = idle_workers.get()
+            try:
+                worker.process_group(group_postcode, group_jobs, total_addresses, on_result)
+            finally:
+                idle_workers.put(worker)
+        
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(run_group, group_postcode, group_jobs)
+                       for group_postcode, group_jobs in groups]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    
+    def prepare_jobs(self, df, postcode_col, address_cols):
+        """Precompute every row's address, postcode keys and filename with vectorized string ops"""
+        # Full address: non-empty address columns (plus Town) joined with ', '
+        part_cols = list(address_cols) + (['Town'] if 'Town' in df.columns else [])
+        full_address = pd.Series('', index=df.index, dtype=object)
+        for col in part_cols:
+            part = clean_text_column(df, col)
+            joined = full_address.where(full_address == '', full_address + ', ') + part
+            full_address = joined.where(part != '', full_address)
+        
+        postcode = df[postcode_col].fillna('nan').astype(str).str.strip()
+        postcode_key = postcode.str.replace(r'\s+', '', regex=True).str.upper()
+        postcode_key = postcode_key.str.replace(r'^(.+)(.{3})$', r'\1 \2', regex=True)
+        
+        filename = self.build_epc_filenames(df)
+        uprn = df['UPRN'].map(normalize_uprn) if 'UPRN' in df.columns else pd.Series('', index=df.index)
+        
+        extra_cols = [col for col in df.columns if col not in address_cols and col != postcode_col]
+        extras = df[extra_cols].to_dict('records')
+        
+        return [
+            PropertyJob(*values)
+            for values in zip(df.index, full_address.tolist(), postcode.tolist(), postcode_key.tolist(),
+                              filename.tolist(), uprn.tolist(), extras)
+        ]
+    
+    def build_epc_filenames(self, df):
+        """EPC - [Scheme] - [Plot] - [Tenure] - [UPRN].pdf for every row, as vectorized string ops"""
+        scheme = clean_text_column(df, 'Scheme Abbreviation', 'UNK')
+        tenure = clean_text_column(df, 'Tenure', 'UNK')
+        uprn = clean_text_column(df, 'UPRN', 'UNK')
+        
+        # Plot numbers are whole numbers: show 1.0 as 1, keep meaningful decimals and non-numeric text
+        plot_raw = clean_text_column(df, 'Development Plot Number', 'UNK')
+        plot_num = pd.to_numeric(plot_raw.where(plot_raw != 'UNK'), errors='coerce')
+        is_whole = plot_num.notna() & (plot_num % 1 == 0)
+        plot = plot_raw.copy()
+        plot[is_whole] = plot_num[is_whole].astype('int64').astype(str)
+        is_decimal = plot_num.notna() & ~is_whole
+        plot[is_decimal] = plot_num[is_decimal].map(str)
+        
+        return "EPC - " + scheme + " - " + plot + " - " + tenure + " - " + uprn + ".pdf"
+    
+    def group_jobs_by_postcode(self, jobs):
+        """Group jobs by normalized postcode, keeping first-seen order"""
+        groups = {}
+        for job in jobs:
+            groups.setdefault(job.postcode_key, []).append(job)
+        return list(groups.items())
+    
+    def record_result(self, job, result_tuple):
+        """Store the audit entry for one processed row and update the counters"""
+        # Handle the returned tuple (success, matched_address, match_score)
+        if isinstance(result_tuple, tuple) and len(result_tuple) >= 3:
+            result, matched_address, match_score = result_tuple[:3]
+        elif isinstance(result_tuple, tuple) and len(result_tuple) == 2:
+            result, matched_address = result_tuple
+            match_score = 0.0
+        else:
+            # Fallback for backward compatibility
+            result = result_tuple if isinstance(result_tuple, bool) else False
+            matched_address = "Address details not captured"
+            match_score = 0.0
+        
+        # Determine match quality based on score
+        match_quality = "Failed"
+        if result and match_score >= HIGH_CONFIDENCE_SCORE:
+            match_quality = "High Confidence"
+        elif result and match_score >= 0.5:
+            match_quality = "Medium Confidence"
+        elif result and match_score > 0.0:
+            match_quality = "Low Confidence"
+        elif result:
+            match_quality = "Fallback Match"
+        
+        # Store result with original row data and audit information
+        result_entry = {
+            'Original_Index': job.index,
+            'Input_Address': job.full_address,  # What we searched for
+            'Input_Postcode': job.postcode,
+            'Matched_Address': matched_address or "No match found",  # What was actually selected
+            'Match_Score': round(match_score, 3) if match_score > 0 else 0.0,
+            'Match_Quality': match_quality,
+            'Status': 'Success' if result else 'Failed',
+            'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        # Add per-row measurements (e.g. download wait time)
+        if isinstance(result_tuple, tuple) and len(result_tuple) >= 4 and result_tuple[3]:
+            result_entry.update(result_tuple[3])
+        
+        # Add any additional columns from original data
+        for col, value in job.extras.items():
+            result_entry[f'Original_{col}'] = value
+        
+        if not self.stream_input:
+            self.results.append(result_entry)  # Streamed runs keep results in the journal only
+        
+        if result_entry.get('Refresh') == 'unchanged':
+            self.refresh_unchanged += 1
+        if result_entry.get('UPRN_Index') == 'hit':
+            self.index_hits += 1
+        elif result_entry.get('UPRN_Index') == 'stale':
+            self.index_stale += 1
+        
+        if result:
+            self.success_count += 1
+            print(f"✅ Matched with: {matched_address}")
+        else:
+            self.failure_count += 1
+            print(f"❌ Failed to match")
+        
+        return result_entry
+    
+    def download_epc_certificate(self, address, postcode, candidates=None, from_cache=False, filename=None, selection=None, row_index=None, uprn=None):
+        """Main method to download EPC certificate for a single address.
+        
+        When ``candidates`` is given (a result list already collected for this
+        postcode) the search pages are skipped and the match is opened directly.
+        A ``uprn`` found in the UPRN index skips the search and matching altogether.
+        """
         matched_address = None
         match_score = 0.0
+        self.row_metrics = {}
+        self.row_index = row_index
+        self.claimed_certificate = None
+        self.shared_from = None
         try:
-            # Navigate to start
-            if not self.navigate_to_start():
-                raise Exception("Failed to navigate to start")
-            
-            # Select domestic property
-            if not self.select_domestic_property():
-                raise Exception("Failed to select domestic property")
-            
-            # Enter postcode
-            if not self.enter_postcode(postcode):
-                raise Exception("Failed to enter postcode")
-            
-            # Select address and capture the matched address
-            result = self.select_address(address, postcode)
-            if not result or (isinstance(result, tuple) and not result[0]):
-                raise Exception("Failed to select address")
-            
-            # Extract matched address from the result
-            if isinstance(result, tuple) and len(result) >= 3:
-                success, matched_address, match_score = result
-                if not success:
-                    raise Exception("Failed to select address")
+            indexed = None
+            if uprn and self.certificate_index:
+                # An earlier run already matched this UPRN: try its certificate before searching
+                indexed = self.open_indexed_certificate(uprn, postcode)
+            if indexed:
+                matched_address, match_score = indexed
             else:
-                matched_address = "Address selected but details not captured"
-                match_score = 0.0
+                if candidates is None:
+                    # Use cached results or navigate, select domestic property and search the postcode
+                    candidates, from_cache = self.get_address_candidates(postcode)
+                    if candidates is None:
+                        raise Exception("Failed to search postcode")
+            
+                if from_cache and not self.has_confident_match(address, candidates, selection):
+                    # The property may have been lodged since the cached search - search again
+                    self.logger.info(f"No confident match in cached results for {postcode}, refreshing search")
+                    candidates, from_cache = self.get_address_candidates(postcode, refresh=True)
+                    selection = None
+                    if candidates is None:
+                        raise Exception("Failed to search postcode")
+            
+                # Select address and capture the matched address
+                result = self.select_address(address, postcode, candidates=candidates, selection=selection)
+                if not result or (isinstance(result, tuple) and not result[0]):
+                    raise Exception("Failed to select address")
             
-            # Generate filename using the original format
-            filename = self.generate_epc_filename(row_data) if row_data is not None else self.generate_simple_filename(address, postcode)
+                # Extract matched address from the result
+                if isinstance(result, tuple) and len(result) >= 3:
+                    success, matched_address, match_score = result
+                    if not success:
+                        raise Exception("Failed to select address")
+                else:
+                    matched_address = "Address selected but details not captured"
+                    match_score = 0.0
             
-            # Download PDF
-            if not self.download_pdf(filename):
-                raise Exception("Failed to download PDF")
+            # Rows come with their EPC filename precomputed (build_epc_filenames)
+            if filename is None:
+                filename = self.generate_simple_filename(address, postcode)
+            
+            output_path = os.path.join(self.output_dir, self.backend.output_filename(filename))
+            if self.shared_from:
+                # Same certificate as an earlier row: give this row its own name for the same file
+                shared_path, shared_row = self.shared_from
+                with self.timed('save'):
+                    method = self.reuse_certificate(shared_path, output_path)
+                self.logger.info(f"Reused certificate from row {shared_row + 1} ({method})")
+                self.row_metrics['Shared_Certificate_With'] = shared_row + 1
+            else:
+                if not self.save_or_keep_certificate(filename, output_path):
+                    raise Exception("Failed to save certificate data" if self.data_only else "Failed to download PDF")
+                if self.claimed_certificate:
+                    # Data-only rows share the metadata file; there is no certificate file
+                    self.shared_certificates.complete(self.claimed_certificate,
+                                                      sidecar_path(output_path) if self.data_only else output_path)
+                    self.claimed_certificate = None
+            if self.data_only:
+                self.row_metrics['Data_File'] = sidecar_path(output_path)
+            else:
+                self.row_metrics['Output_File'] = output_path
+            
+            if uprn and self.certificate_index and not indexed and match_score >= HIGH_CONFIDENCE_SCORE:
+                self.index_certificate(uprn, postcode, matched_address, match_score)
             
             self.logger.info(f"Successfully processed: {address}, {postcode}")
-            return True, matched_address, match_score
+            return True, matched_address, match_score, self.row_metrics
             
         except Exception as e:
             self.logger.error(f"Failed to process {address}, {postcode}: {e}")
-            return False, matched_address, match_score
+            self.row_metrics['Error'] = str(e)
+            if from_cache and self.cache:
+                # Don't let a stale cached result list fail the next run too
+                self.cache.invalidate(normalize_postcode(postcode))
+            return False, matched_address, match_score, self.row_metrics
+        finally:
+            if self.claimed_certificate:
+                # Let any row waiting on this certificate fetch it itself
+                self.shared_certificates.fail(self.claimed_certificate)
+                self.claimed_certificate = None
 
-    def generate_epc_filename(self, row_data):
-        """Generate filename in the original EPC format: EPC - [Scheme] - [Plot] - [Tenure] - [UPRN].pdf"""
+    def save_or_keep_certificate(self, filename, output_path):
+        """Save the open certificate with its metadata sidecar; with --refresh, keep an unchanged file as it is"""
+        with self.timed('metadata'):
+            metadata = self.current_certificate_metadata()
+        if metadata:
+            self.row_metrics.update(report_columns(metadata))
+        
+        if self.data_only:
+            # The fields are the output: write the metadata file and skip the PDF
+            if not metadata:
+                return False
+            with self.timed('save'):
+                return write_sidecar(output_path, metadata, self.logger)
+        
+        if self.refresh:
+            reason = refresh_reason(output_path, metadata) if metadata else 'metadata unavailable'
+            if reason is None:
+                self.logger.info(f"Certificate unchanged, keeping {os.path.basename(output_path)}")
+                self.row_metrics['Refresh'] = 'unchanged'
+                return True
+            self.logger.info(f"Saving certificate again: {reason}")
+            self.row_metrics['Refresh'] = f"updated ({reason})"
+        
+        # Download PDF (or save the certificate page with the HTTP backend)
+        with self.timed('save'):
+            saved = self.backend.save_certificate(filename)
+        if saved and metadata:
+            write_sidecar(output_path, metadata, self.logger)
+        return saved
+    
+    def reuse_certificate(self, shared_path, output_path):
+        """Link an earlier row's certificate (or, data-only, its metadata file) to this row's filename"""
+        if self.data_only:
+            method = link_or_copy(shared_path, sidecar_path(output_path))
+        else:
+            method = link_or_copy(shared_path, output_path)
+            if os.path.exists(sidecar_path(shared_path)):
+                link_or_copy(sidecar_path(shared_path), sidecar_path(output_path))
+        
+        metadata = read_sidecar(output_path)
+        if metadata:
+            self.row_metrics.update(report_columns(metadata))
+        return method
+    
+    def current_certificate_metadata(self):
+        """RRN, dates and content hash of the open certificate page, or None if the page can't be read"""
         try:
-            # Extract components from row data
-            scheme = str(row_data.get('Scheme Abbreviation', 'UNK')).strip()
-            plot_raw = str(row_data.get('Development Plot Number', 'UNK')).strip()
-            tenure = str(row_data.get('Tenure', 'UNK')).strip()
-            uprn = str(row_data.get('UPRN', 'UNK')).strip()
-            
-            # Clean components (remove 'nan' and empty values)
-            scheme = scheme if scheme and scheme.lower() != 'nan' else 'UNK'
-            tenure = tenure if tenure and tenure.lower() != 'nan' else 'UNK'
-            uprn = uprn if uprn and uprn.lower() != 'nan' else 'UNK'
-            
-            # Clean up plot number - remove decimal places for whole numbers
-            if plot_raw and plot_raw.lower() != 'nan':
-                try:
-                    plot_float = float(plot_raw)
-                    if plot_float.is_integer():
-                        plot = str(int(plot_float))  # Convert 1.0 to 1
-                    else:
-                        plot = str(plot_float)  # Keep decimals if they're meaningful
-                except ValueError:
-                    plot = plot_raw  # Keep as-is if not a number
-            else:
-                plot = 'UNK'
-            
-            filename = f"EPC - {scheme} - {plot} - {tenure} - {uprn}.pdf"
-            self.logger.info(f"Generated EPC filename: {filename}")
-            return filename
-            
+            url, html = self.backend.current_page()
+            return certificate_metadata(url, html)
         except Exception as e:
-            self.logger.warning(f"Error generating EPC filename, using fallback: {e}")
-            return self.generate_simple_filename("Property", "Unknown")
+            self.logger.warning(f"Could not read certificate metadata: {e}")
+            return None
     
     def generate_simple_filename(self, address, postcode):
         """Generate simple filename as fallback"""
@@ -1097,7 +2134,7 @@ class EPCCertificateScraper:
     def emergency_cleanup(self):
         """Emergency cleanup function that runs on unexpected exit"""
         try:
-            if hasattr(self, 'results') and self.results:
+            if hasattr(self, 'results') and self.has_results() and not self.report_path:
                 print("\n🚨 Emergency cleanup: Generating Excel report...")
                 self.logger.info("Emergency cleanup: Generating Excel report")
                 self.generate_excel_report(interrupted=True)
@@ -1105,9 +2142,21 @@ class EPCCertificateScraper:
         except Exception as e:
             print(f"❌ Error during emergency cleanup: {e}")
         
+        if getattr(self, 'job_queue', None):
+            try:
+                self.job_queue.release(self.queue_owner)
+            except:
+                pass
+        
+        for worker in getattr(self, 'worker_scrapers', []) + getattr(self, 'lookup_scrapers', []):
+            try:
+                worker.backend.close()
+            except:
+                pass
+        
         try:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
+            if getattr(self, 'backend', None):
+                self.backend.close()
         except:
             pass
 
@@ -1115,17 +2164,56 @@ class EPCCertificateScraper:
         """Cleanup resources and ensure final report is generated"""
         try:
             # Generate final report if we have any results
-            if hasattr(self, 'results') and self.results:
+            if hasattr(self, 'results') and self.has_results() and not self.report_path:
                 print("🔄 Generating final Excel report...")
                 self.generate_excel_report()
         except Exception as e:
             self.logger.error(f"Error generating final report during cleanup: {e}")
         
-        # Close browser
-        if hasattr(self, 'driver'):
+        # Close worker sessions
+        for worker in getattr(self, 'worker_scrapers', []) + getattr(self, 'lookup_scrapers', []):
+            try:
+                worker.backend.close()
+            except:
+                pass
+        self.worker_scrapers = []
+        self.lookup_scrapers = []
+        
+        # Close browser / HTTP connections
+        if getattr(self, 'backend', None):
+            try:
+                self.backend.close()
+                self.logger.info(f"{self.backend.name} backend closed")
+            except:
+                pass
+        
+        if getattr(self, 'cache', None):
+            try:
+                self.cache.close()
+            except:
+                pass
+        
+        if getattr(self, 'certificate_index', None):
+            try:
+                self.certificate_index.close()
+            except:
+                pass
+        
+        if getattr(self, 'job_queue', None):
             try:
-                self.driver.quit()
-                self.logger.info("Browser closed")
+                # Unfinished rows go straight back to the queue instead of waiting for the lease to expire
+                self.job_queue.release(self.queue_owner)
+                self.job_queue.close()
+            except:
+                pass
+            self.job_queue = None
+        
+        if getattr(self, 'profile_slot', None) and not self.worker_id:  # Workers share their coordinator's slot
+            self.profile_slot.release()
+        
+        if getattr(self, 'journal', None):
+            try:
+                self.journal.close()
             except:
                 pass
 
@@ -1137,17 +2225,162 @@ def main():
     parser.add_argument('--download-dir', '-d', type=str, 
                        default='C:\\Users\\IS19\\Documents\\EPC_Scraper\\Processed',
                        help='Download directory for PDFs')
+    parser.add_argument('--batch-by-postcode', action='store_true',
+                       help='Search each postcode once and reuse the address list for every row in it')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always search the live site instead of using cached postcode results')
+    parser.add_argument('--no-uprn-index', action='store_true',
+                       help="Search every row even when an earlier run already found the UPRN's certificate")
+    parser.add_argument('--cache-ttl-hours', type=float, default=168,
+                       help='How long cached postcode results stay valid (default: 168 hours)')
+    parser.add_argument('--cache-max-entries', type=int, default=5000,
+                       help='Maximum number of postcodes kept in the cache (default: 5000)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of parallel browser sessions (each gets its own download folder)')
+    parser.add_argument('--pipeline', action='store_true',
+                       help='Run postcode lookup, matching, certificate download and result recording as separate stages')
+    parser.add_argument('--lookup-workers', type=int, default=1,
+                       help='Sessions searching postcodes in --pipeline mode (default: 1)')
+    parser.add_argument('--match-workers', type=int, default=1,
+                       help='Threads matching addresses in --pipeline mode (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=50,
+                       help='Items allowed to wait in front of each --pipeline stage (default: 50)')
+    parser.add_argument('--queue-db', type=str, default=None,
+                       help='Job queue file shared by --enqueue, --worker and --queue-report (default: queue/epc_jobs.sqlite3 next to the download directory)')
+    parser.add_argument('--enqueue', type=str, metavar='FILE',
+                       help='Add every row of a spreadsheet to the job queue and exit')
+    parser.add_argument('--worker', action='store_true',
+                       help='Process rows from the job queue until none are left; run as many of these processes as you like')
+    parser.add_argument('--queue-report', action='store_true',
+                       help='Render the combined Excel report of every worker from the job queue and exit')
+    parser.add_argument('--batch-size', type=int, default=25,
+                       help='Rows a --worker claims at a time (default: 25)')
+    parser.add_argument('--lease-seconds', type=float, default=300,
+                       help='How long a claimed batch stays with a worker without progress before others may take it over (default: 300)')
+    parser.add_argument('--max-attempts', type=int, default=3,
+                       help='Times a row may be claimed before it is given up as failed (default: 3)')
+    parser.add_argument('--rate-limit', type=float, default=1.0,
+                       help='Maximum page requests per second, shared across all workers (default: 1)')
+    parser.add_argument('--burst', type=int, default=2,
+                       help='Requests allowed back to back before --rate-limit spacing applies (default: 2)')
+    parser.add_argument('--max-in-flight', type=int, default=None,
+                       help='Upper bound on concurrent page requests; adapted down on errors, slow pages and 429s (default: --workers, plus --lookup-workers with --pipeline)')
+    parser.add_argument('--target-latency', type=float, default=5.0,
+                       help='Page load time in seconds above which the limiter backs off (default: 5)')
+    parser.add_argument('--download-timeout', type=float, default=60,
+                       help='Maximum seconds to wait for a printed PDF to finish downloading (default: 60)')
+    parser.add_argument('--pdf-mode', choices=['print', 'devtools'], default='print',
+                       help="print uses Chrome's print dialog and the download folder; devtools renders the PDF with Page.printToPDF and writes it directly")
+    parser.add_argument('--browser-profile', choices=['default', 'performance'], default='default',
+                       help='performance runs Chrome headless with a persistent profile and disk cache, blocks images, fonts and tracking on search pages and renders PDFs via DevTools')
+    parser.add_argument('--recycle-browser-every', type=int, default=200,
+                       help='Restart Chrome every N properties to keep its memory in check (0 = never, default: 200)')
+    parser.add_argument('--max-browser-memory-mb', type=int, default=1500,
+                       help='Restart Chrome when its processes use more than this much memory (needs psutil; 0 = no limit, default: 1500)')
+    parser.add_argument('--selector-probe-timeout', type=float, default=3,
+                       help='Seconds to poll all known selectors for a page element before falling back to the full 20 s wait (default: 3)')
+    parser.add_argument('--data-only', action='store_true',
+                       help='Read rating, scores, certificate number and dates from each certificate page without saving PDFs')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Only save certificates that are new, missing or changed since they were last saved')
+    parser.add_argument('--no-dedupe', action='store_true',
+                       help='Download the certificate again for every row, even when rows resolve to the same certificate')
+    parser.add_argument('--deep-link', action='store_true',
+                       help="Open each postcode's results page directly, falling back to the Start now / domestic flow if that fails")
+    parser.add_argument('--resume', action='store_true',
+                       help="Skip rows the run journal records as completed whose output file still exists")
+    parser.add_argument('--stream', action='store_true',
+                       help='Read the spreadsheet in chunks and keep results on disk only, for very large sheets (always on for .csv and .parquet)')
+    parser.add_argument('--chunk-size', type=int, default=1000,
+                       help='Rows per chunk when streaming the input (default: 1000)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                       help='Serve live stage timings and run counters at http://localhost:PORT/metrics in Prometheus text format')
+    parser.add_argument('--render-report', type=str, metavar='JOURNAL',
+                       help='Render the Excel report from a run journal and exit (no browser is started)')
+    parser.add_argument('--backend', choices=['selenium', 'http'], default='selenium',
+                       help='selenium drives Chrome and prints PDFs; http fetches the pages directly and saves them as HTML')
+    parser.add_argument('--start-url', type=str, default=GOV_UK_START_URL,
+                       help='Start page of the certificate search (override to use a local stand-in site)')
+    parser.add_argument('--service-url', type=str, default=EPC_SERVICE_URL,
+                       help='Base URL of the find-energy-certificate service used by the http backend')
     
     args = parser.parse_args()
     
+    if args.render_report:
+        # Report on demand from the checkpointed journal, e.g. while a long run is still going
+        reporter = EPCCertificateScraper(download_dir=args.download_dir, use_cache=False, backend=None)
+        rows, total_rows = reporter.load_results_from_journal(args.render_report)
+        finished = total_rows is not None and rows >= total_rows
+        print(f"Loaded {rows} of {total_rows if total_rows is not None else 'unknown'} rows from {args.render_report}")
+        # A journal covering every input row gets the final report; marking it generated also
+        # stops the exit handler writing another one
+        reporter.report_path = reporter.generate_excel_report(intermediate=not finished)
+        return
+    
+    queue_db = args.queue_db or os.path.join(os.path.dirname(args.download_dir), "queue", "epc_jobs.sqlite3")
+    if args.enqueue or args.queue_report:
+        reporter = EPCCertificateScraper(download_dir=args.download_dir, use_cache=False, backend=None,
+                                         stream_input=args.stream, chunk_size=max(1, args.chunk_size))
+        job_queue = JobQueue(queue_db, logger=reporter.logger)
+        try:
+            if args.enqueue:
+                if not os.path.exists(args.enqueue):
+                    print(f"Error: Specified file '{args.enqueue}' not found")
+                    return
+                reporter.enqueue_spreadsheet(args.enqueue, job_queue)
+            else:
+                counts = job_queue.counts()
+                rows = reporter.load_results_from_queue(job_queue)
+                print(f"Loaded {rows} rows from {queue_db} ({counts['pending'] + counts['leased']} still to do)")
+                reporter.report_path = reporter.generate_excel_report(
+                    intermediate=bool(counts['pending'] or counts['leased']))
+        finally:
+            job_queue.close()
+        return
+    
     # Initialize scraper
-    scraper = EPCCertificateScraper(download_dir=args.download_dir)
+    scraper = EPCCertificateScraper(download_dir=args.download_dir,
+                                    batch_by_postcode=args.batch_by_postcode,
+                                    use_cache=not args.no_cache,
+                                    cache_ttl_hours=args.cache_ttl_hours,
+                                    cache_max_entries=args.cache_max_entries,
+                                    backend=args.backend,
+                                    start_url=args.start_url,
+                                    service_url=args.service_url,
+                                    workers=max(1, args.workers),
+                                    rate_limit=args.rate_limit,
+                                    burst=args.burst,
+                                    max_in_flight=args.max_in_flight,
+                                    target_latency=args.target_latency,
+                                    download_timeout=args.download_timeout,
+                                    pdf_mode=args.pdf_mode,
+                                    deep_link=args.deep_link,
+                                    resume=args.resume,
+                                    stream_input=args.stream,
+                                    chunk_size=max(1, args.chunk_size),
+                                    browser_profile=args.browser_profile,
+                                    recycle_every=max(0, args.recycle_browser_every),
+                                    max_browser_mb=max(0, args.max_browser_memory_mb),
+                                    selector_probe_timeout=args.selector_probe_timeout,
+                                    dedupe_certificates=not args.no_dedupe,
+                                    use_uprn_index=not args.no_uprn_index,
+                                    refresh=args.refresh,
+                                    data_only=args.data_only,
+                                    pipeline=args.pipeline,
+                                    lookup_workers=max(1, args.lookup_workers),
+                                    match_workers=max(1, args.match_workers),
+                                    queue_size=max(1, args.queue_size),
+                                    queue_worker=args.worker)
+    
+    if args.metrics_port:
+        metrics_server = MetricsServer(scraper.timer, args.metrics_port, gauges=scraper.metrics_gauges).start()
+        print(f"📈 Metrics at http://localhost:{metrics_server.port}/metrics")
     
     def signal_handler(signum, frame):
         """Handle Ctrl+C gracefully"""
         print("\n🛑 Interrupt signal received. Saving progress...")
         scraper.logger.info("Interrupt signal received")
-        if hasattr(scraper, 'results') and scraper.results:
+        if hasattr(scraper, 'results') and scraper.has_results():
             scraper.generate_excel_report(interrupted=True)
             print("✅ Progress saved to Excel report")
         scraper.cleanup()
@@ -1160,6 +2393,15 @@ def main():
         # Determine spreadsheet file
         spreadsheet_path = None
         
+        if args.worker:
+            scraper.job_queue = JobQueue(queue_db, lease_seconds=args.lease_seconds,
+                                         max_attempts=max(1, args.max_attempts), logger=scraper.logger)
+            if scraper.process_queue(scraper.job_queue, batch_size=max(1, args.batch_size)):
+                print("\nWorker finished!")
+                print(f"Successful downloads: {scraper.success_count}")
+                print(f"Failed downloads: {scraper.failure_count}")
+            return
+        
         if args.file:
             # Use specified file
             if os.path.exists(args.file):
@@ -1215,7 +2457,7 @@ def main():
     
     except KeyboardInterrupt:
         print("\n🛑 Processing interrupted by user")
-        if hasattr(scraper, 'results') and scraper.results:
+        if hasattr(scraper, 'results') and scraper.has_results():
             print("💾 Saving progress to Excel report...")
             scraper.generate_excel_report(interrupted=True)
             print("✅ Progress saved!")
@@ -1223,7 +2465,7 @@ def main():
     except Exception as e:
         print(f"❌ An error occurred: {e}")
         scraper.logger.error(f"Main execution error: {e}")
-        if hasattr(scraper, 'results') and scraper.results:
+        if hasattr(scraper, 'results') and scraper.has_results():
             print("💾 Saving progress to Excel report...")
             scraper.generate_excel_report(error=True)
     finally:
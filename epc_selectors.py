@@ -0,0 +1,52 @@
+import json
+import logging
+import os
+import threading
+
+from epc_downloads import write_atomically
+
+
+class SelectorRegistry:
+    """Remember which locator strategy last worked for each page step, persisted across runs as JSON"""
+
+    def __init__(self, path, logger=None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self.lock = threading.Lock()
+        self.preferred_by_step = {}  # step -> strategy name that last succeeded
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.preferred_by_step = json.load(f)
+            self.logger.info(f"Loaded selector preferences for {len(self.preferred_by_step)} steps from {self.path}")
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable selector registry {self.path}: {e}")
+            self.preferred_by_step = {}
+
+    def preferred(self, step):
+        with self.lock:
+            return self.preferred_by_step.get(step)
+
+    def ordered(self, step, names):
+        """Strategy names with the last successful one first, the rest in their default order"""
+        preferred = self.preferred(step)
+        if preferred in names:
+            return [preferred] + [name for name in names if name != preferred]
+        return list(names)
+
+    def record_success(self, step, name):
+        """Remember the strategy that worked, writing the file only when the preference changes"""
+        with self.lock:
+            if self.preferred_by_step.get(step) == name:
+                return
+            self.preferred_by_step[step] = name
+            data = json.dumps(self.preferred_by_step, indent=2).encode('utf-8')
+        self.logger.info(f"Selector for '{step}' is now '{name}'")
+        try:
+            write_atomically(self.path, data)
+        except Exception as e:
+            self.logger.warning(f"Could not save selector registry: {e}")
@@ -0,0 +1,149 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PERCENTILES = (50, 95, 99)
+MAX_SAMPLES = 10000  # Durations kept per stage for percentiles; count, total and max stay exact
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def stage_column(stage):
+    """Report column holding a row's time in one stage, e.g. search -> Time_search_s"""
+    return f"Time_{stage}_s"
+
+
+class StageTimer:
+    """Collect durations per pipeline stage for a whole run (shared by every worker).
+
+    Memory stays flat however many rows a run has: each stage keeps a uniform
+    random sample of at most max_samples durations for the percentiles.
+    """
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.durations = defaultdict(list)  # stage -> sampled durations
+        self.counts = defaultdict(int)
+        self.totals = defaultdict(float)
+        self.maxima = defaultdict(float)
+        self.random = random.Random(0)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    @contextmanager
+    def span(self, stage, row=None):
+        """Time a block as one occurrence of ``stage``; also add it to the row's metrics dict if given"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, row)
+
+    def record(self, stage, seconds, row=None):
+        with self.lock:
+            self.counts[stage] += 1
+            self.totals[stage] += seconds
+            self.maxima[stage] = max(self.maxima[stage], seconds)
+            samples = self.durations[stage]
+            if len(samples) < self.max_samples:
+                samples.append(seconds)
+            else:
+                # Reservoir sampling: every duration so far has the same chance of being kept
+                slot = self.random.randrange(self.counts[stage])
+                if slot < self.max_samples:
+                    samples[slot] = seconds
+        if row is not None:
+            column = stage_column(stage)
+            row[column] = round(row.get(column, 0) + seconds, 4)
+
+    def summary(self):
+        """Count, total, mean, p50/p95/p99 and max for every stage, in first-seen order"""
+        with self.lock:
+            snapshot = {stage: (sorted(values), self.counts[stage], self.totals[stage], self.maxima[stage])
+                        for stage, values in self.durations.items()}
+
+        summary = {}
+        for stage, (values, count, total, maximum) in snapshot.items():
+            stats = {
+                'count': count,
+                'total_s': round(total, 4),
+                'mean_s': round(total / count, 4) if count else 0.0,
+            }
+            for q in PERCENTILES:
+                stats[f'p{q}_s'] = round(percentile(values, q), 4)
+            stats['max_s'] = round(maximum, 4)
+            summary[stage] = stats
+        return summary
+
+    def write_json(self, path, **extra):
+        """Write the stage summary (plus run totals such as rows processed) to a JSON file"""
+        data = dict(extra)
+        data['elapsed_s'] = round(time.monotonic() - self.started, 3)
+        data['stages'] = self.summary()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=str)
+        return path
+
+    def prometheus_text(self, gauges=None):
+        """The stage summary (and optional gauges) in Prometheus text exposition format"""
+        lines = [
+            "# HELP epc_stage_duration_seconds Time spent in each scraper stage",
+            "# TYPE epc_stage_duration_seconds summary",
+        ]
+        for stage, stats in self.summary().items():
+            for q in PERCENTILES:
+                lines.append(f'epc_stage_duration_seconds{{stage="{stage}",quantile="{q / 100}"}} {stats[f"p{q}_s"]}')
+            lines.append(f'epc_stage_duration_seconds_sum{{stage="{stage}"}} {stats["total_s"]}')
+            lines.append(f'epc_stage_duration_seconds_count{{stage="{stage}"}} {stats["count"]}')
+
+        for name, value in (gauges or {}).items():
+            lines.append(f"# TYPE epc_{name} gauge")
+            lines.append(f"epc_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve /metrics in Prometheus text format from a background thread"""
+
+    def __init__(self, timer, port, host='127.0.0.1', gauges=None):
+        self.timer = timer
+        self.gauges = gauges  # Callable returning {name: value}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = server.timer.prometheus_text(server.gauges() if server.gauges else None).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()